@@ -0,0 +1,24 @@
+import sys
+import time
+from interpreter.zygote import Client
+
+# usage: python client.py [--socket=path] [run.py arguments ...]
+path = None
+args = []
+for arg in sys.argv[1:]:
+    if(arg.startswith("--socket=")):
+        path = arg[len("--socket="):]
+    else:
+        args.append(arg)
+
+# run the program in a worker of the zygote instead of a new interpreter
+start = time.perf_counter()
+try:
+    status = Client(path).run(args)
+except (FileNotFoundError, ConnectionRefusedError):
+    print("no zygote is running, start it with python zygote.py", file = sys.stderr)
+    sys.exit(1)
+
+# the time from sending the request until the status arrived
+print("latency: %.1f ms" % ((time.perf_counter() - start) * 1000), file = sys.stderr)
+sys.exit(status)
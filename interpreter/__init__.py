@@ -3,4 +3,16 @@ from .lexer import Lexer
 from .parser import Parser
 from .ast import *
 from .error import *
-from .interpreter import Interpreter, Environment
\ No newline at end of file
+from .interpreter import Interpreter, Environment
+from .typecheck import TypeChecker, Type, Mode
+from .incremental import IncrementalParser
+from .loader import FileLoader, Prefetcher
+from .linker import Linker, Artifact
+from .optimizer import Optimizer
+from .ir import Lowering, IRInterpreter
+from .iropt import IROptimizer
+from .cbackend import CGenerator, CBackend
+from .parallel import ParallelLexer
+from .symbol import SymbolTable, symbols
+from .zygote import Zygote, Client
+from .encoding import Encoder, Decoder
\ No newline at end of file
@@ -4,10 +4,24 @@ class Scope(object):
     def __init__(self):
         self.stmts = []
 
+        # only scopes that can declare variables need their own frame
+        self.declares = False
+
+        # the tokens of a lazy scope until its statements are parsed
+        self.tokens = None
+
     def add(self, stmt):
         self.stmts.append(stmt)
+        if(isinstance(stmt, (Declaration, Load, Exec))):
+            self.declares = True
+
+    def update(self):
+        """find out again if the scope needs a frame, after changing stmts"""
+        self.declares = any(isinstance(stmt, (Declaration, Load, Exec)) for stmt in self.stmts)
 
     def __repr__(self):
+        if(self.tokens is not None):
+            return "Scope{lazy}"
         return "Scope{%s}" % (self.stmts)
 
     def visit(self, visitor):
@@ -109,6 +123,10 @@ class Binary(object):
         self.right = right
         self.left = left
 
+        # the operand and result types, annotated by the type checker
+        self.mode = None
+        self.type = None
+
     def __repr__(self):
         return "Binary{%s, %s, %s}" % (self.operator, self.left, self.right)
 
@@ -122,6 +140,9 @@ class Unary(object):
         self.operator = operator
         self.expr = expr
 
+        # the result type, annotated by the type checker
+        self.type = None
+
     def __repr__(self):
         return "Unary{%s, %s}" % (self.operator, self.expr)
 
@@ -134,6 +155,9 @@ class Literal(object):
     def __init__(self, value):
         self.value = value
 
+        # the type, annotated by the type checker
+        self.type = None
+
     def __repr__(self):
         return "Literal{%s}" % (self.value)
 
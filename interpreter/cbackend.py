@@ -0,0 +1,295 @@
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from .ast import *
+from .token import Kind, Token
+from .typecheck import Type
+from .symbol import symbols
+from .error import UnsupportedError
+from . import paths
+
+class CGenerator(object):
+    """this class generates c code for programs using only ints and bools
+
+    every variable is a int64_t, the static type decides how it is printed.
+    the arithmetic is checked for overflow, an overflow exits the program
+    with the status CBackend.overflow so the program can be run again by
+    the interpreter with unbounded ints. strings, division, exec, load,
+    lazy scopes and variables without a value raise an UnsupportedError.
+    this class uses a visitor pattern to access the ast"""
+
+    # the c operators of the comparisons
+    comparisons = {
+        Kind.CMPEQ: "==",
+        Kind.CMPNOTEQ: "!=",
+        Kind.CMPLESS: "<",
+        Kind.CMPLESSEQ: "<=",
+        Kind.CMPGREATER: ">",
+        Kind.CMPGREATEREQ: ">="
+    }
+
+    # the checked c functions of the arithmetic operators
+    arithmetic = {
+        Kind.PLUS: "add",
+        Kind.MINUS: "sub",
+        Kind.MULT: "mul"
+    }
+
+    # the start of every program
+    header = """#include <stdio.h>
+#include <stdlib.h>
+#include <stdint.h>
+
+static void overflow(void) { exit(%d); }
+static int64_t add(int64_t a, int64_t b) { int64_t r; if(__builtin_add_overflow(a, b, &r)) overflow(); return r; }
+static int64_t sub(int64_t a, int64_t b) { int64_t r; if(__builtin_sub_overflow(a, b, &r)) overflow(); return r; }
+static int64_t mul(int64_t a, int64_t b) { int64_t r; if(__builtin_mul_overflow(a, b, &r)) overflow(); return r; }
+static void print(int64_t value, int isbool) {
+    if(isbool) puts(value ? "True" : "False");
+    else printf("%%lld\\n", (long long) value);
+}
+
+int main(int argc, char **argv) {
+"""
+
+    def __init__(self, ast, inputs):
+        self.ast = ast
+
+        # the types of the variables read from the environment
+        self.inputs = inputs
+        self.names = []
+
+        # the variables visible by name, as (c name, type) per scope
+        self.scopes = [{}]
+        self.count = 0
+        self.lines = []
+        self.depth = 1
+
+    def generate(self):
+        """return the c code of the program"""
+
+        # a single declaration declares into the environment
+        if(isinstance(self.ast, Declaration)):
+            raise UnsupportedError("declaration into the environment")
+
+        self.statement(self.ast)
+        lines = ["    int64_t %s = strtoll(argv[%d], 0, 10);" % (self.input(name)[0], index + 1)
+                 for index, name in enumerate(self.names)]
+        return self.header % (CBackend.overflow) + "\n".join(lines + self.lines) + "\n    return 0;\n}\n"
+
+    def statement(self, stmt):
+        """visit a statement, the value of expressions is dropped"""
+        result = stmt.visit(self)
+        if(result):
+            self.emit("(void) %s;" % (result[0]))
+
+    def emit(self, line):
+        """add a line with the current indentation"""
+        self.lines.append("    " * self.depth + line)
+
+    def input(self, name):
+        """return the c name and type of a variable of the environment"""
+        if(name not in self.inputs):
+            raise UnsupportedError("variable %s" % (name))
+        if(name not in self.names):
+            self.names.append(name)
+        return ("in%d" % (self.names.index(name)), self.inputs[name])
+
+    def find(self, name):
+        """return the c name and type of a variable"""
+        for scope in reversed(self.scopes):
+            if(name in scope):
+                if(scope[name] is None):
+                    # the variable is read before it has a value
+                    raise UnsupportedError("variable without value")
+                return scope[name]
+        return self.input(name)
+
+    def visitScope(self, scope):
+        """visit a scope node"""
+        if(scope.tokens is not None):
+            raise UnsupportedError("lazy scope")
+
+        self.emit("{")
+        self.depth += 1
+        self.scopes.append({})
+        for stmt in scope.stmts:
+            self.statement(stmt)
+        self.scopes.pop()
+        self.depth -= 1
+        self.emit("}")
+
+    def visitIf(self, ifa):
+        """visit a if node"""
+        self.emit("if(%s)" % (ifa.condition.visit(self)[0]))
+        ifa.scope.visit(self)
+
+    def visitWhile(self, whilea):
+        """visit a while node"""
+        self.emit("while(%s)" % (whilea.condition.visit(self)[0]))
+        whilea.scope.visit(self)
+
+    def visitPrint(self, p):
+        """visit a print node"""
+        code, kind = p.expr.visit(self)
+        self.emit("print(%s, %d);" % (code, kind == Type.BOOL))
+
+    def visitLoad(self, load):
+        """visit a load node"""
+        raise UnsupportedError("load statement")
+
+    def visitExec(self, exe):
+        """visit a exec node"""
+        raise UnsupportedError("exec statement")
+
+    def visitAssign(self, assign):
+        """visit an assign node"""
+        code, kind = assign.expr.visit(self)
+        name, other = self.find(assign.name.value)
+
+        # declared variables are named v, the ones of the environment in
+        if(name.startswith("v") and other == kind):
+            self.emit("%s = %s;" % (name, code))
+            return
+
+        # variables keep their type and the environment is not written
+        raise UnsupportedError("assignment")
+
+    def visitDeclaration(self, decl):
+        """visit a declaration node"""
+        if(not decl.expr):
+            raise UnsupportedError("variable without value")
+
+        # the variable is declared before the expression is evaluated
+        self.scopes[-1][decl.name.value] = None
+        code, kind = decl.expr.visit(self)
+
+        name = "v%d" % (self.count)
+        self.count += 1
+        self.scopes[-1][decl.name.value] = (name, kind)
+        self.emit("int64_t %s = %s;" % (name, code))
+
+    def visitBinary(self, binary):
+        """visit a binary expression, returning the code and type"""
+        left = binary.left.visit(self)[0]
+        right = binary.right.visit(self)[0]
+        kind = binary.operator.kind
+        if(kind in self.arithmetic):
+            return ("%s(%s, %s)" % (self.arithmetic[kind], left, right), Type.INT)
+        elif(kind in self.comparisons):
+            return ("(%s %s %s)" % (left, self.comparisons[kind], right), Type.BOOL)
+
+        # the division of ints returns a float
+        raise UnsupportedError("division")
+
+    def visitUnary(self, unary):
+        """visit a unary expression, returning the code and type"""
+        expr = unary.expr.visit(self)
+        if(unary.operator.kind == Kind.MINUS):
+            return ("sub(0, %s)" % (expr[0]), Type.INT)
+        elif(unary.operator.kind == Kind.BANG):
+            return ("(!%s)" % (expr[0]), Type.BOOL)
+
+        # the interpreter returns the value unchanged
+        return expr
+
+    def visitLiteral(self, literal):
+        """visit a literal node, returning the code and type"""
+        kind = literal.value.kind
+        if(kind == Kind.NUMBER):
+            if(literal.value.value >= 2 ** 63):
+                raise UnsupportedError("large number")
+            return ("INT64_C(%d)" % (literal.value.value), Type.INT)
+        elif(kind == Kind.TRUE):
+            return ("1", Type.BOOL)
+        elif(kind == Kind.FALSE):
+            return ("0", Type.BOOL)
+        elif(kind == Kind.IDENT):
+            return self.find(literal.value.value)
+        raise UnsupportedError("string")
+
+
+class CBackend(object):
+    """this class compiles a program to an executable with the system c
+    compiler and runs it, the executables are cached by their code in a
+    directory only the user can access"""
+
+    # the exit status of a program with an overflow
+    overflow = 3
+
+    def __init__(self, ast, compiler = None):
+        self.ast = ast
+        self.compiler = compiler or shutil.which("cc")
+
+        # the directory of the executables, the private cache of the user if None
+        self.cache = None
+
+    def inputs(self, env):
+        """return the types of the int and bool variables of the environment"""
+        inputs = {}
+        for frame in env.stack:
+            for symbol, value in frame.items():
+                name = symbols.name(symbol)
+                if(type(value) == bool):
+                    inputs[name] = Type.BOOL
+                elif(type(value) == int and -2 ** 63 <= value < 2 ** 63):
+                    inputs[name] = Type.INT
+                else:
+                    inputs.pop(name, None)
+        return inputs
+
+    def build(self, code):
+        """compile the c code, returning the path of the executable"""
+        if(not self.compiler):
+            raise UnsupportedError("compiler")
+
+        try:
+            cache = self.cache or paths.cache("ccp-native")
+        except OSError:
+            # an executable from a directory of someone else is not run
+            raise UnsupportedError("cache")
+
+        digest = hashlib.sha256(code.encode()).hexdigest()[:32]
+        path = os.path.join(cache, digest)
+        if(os.path.exists(path)):
+            return path
+
+        # every build has its own files, so parallel builds do not collide
+        fd, source = tempfile.mkstemp(".c", digest, cache)
+        with os.fdopen(fd, "w") as f:
+            f.write(code)
+        fd, target = tempfile.mkstemp("", digest, cache)
+        os.close(fd)
+        try:
+            # build next to the cached one so a finished executable appears at once
+            result = subprocess.run([self.compiler, "-O2", "-o", target, source],
+                                    capture_output = True)
+            if(result.returncode != 0):
+                raise UnsupportedError("compiler")
+            os.chmod(target, 0o700)
+            os.replace(target, path)
+        finally:
+            os.unlink(source)
+            if(os.path.exists(target)):
+                os.unlink(target)
+        return path
+
+    def run(self, env):
+        """run the program, returns False if it has to be interpreted"""
+        try:
+            generator = CGenerator(self.ast, self.inputs(env))
+            path = self.build(generator.generate())
+        except UnsupportedError:
+            return False
+
+        args = [str(int(env.getValue(symbols.intern(name)))) for name in generator.names]
+        result = subprocess.run([path] + args, stdout = subprocess.PIPE)
+        if(result.returncode != 0):
+            # the output is dropped, the interpreter prints it again
+            return False
+
+        sys.stdout.write(result.stdout.decode())
+        return True
@@ -0,0 +1,151 @@
+from .token import Kind, Token
+from .ast import *
+
+class Encoder(object):
+    """this class converts an ast to plain data
+
+    every node becomes a tuple of its name and its children, tokens become
+    tuples of their kind, value, line, start and end. the data only contains
+    tuples, strings, ints and None, so it can be sent to other processes and
+    stored as json without running code when it is read back.
+    this class uses a visitor pattern to access the ast"""
+
+    def __init__(self, ast):
+        self.ast = ast
+
+    def encode(self):
+        """return the data of the ast"""
+        return self.ast.visit(self)
+
+    def token(self, token):
+        """return the data of a token"""
+        return (token.kind.value, token.value, token.line, token.start, token.end)
+
+    def visitScope(self, scope):
+        """visit a scope node"""
+        if(scope.tokens is not None):
+            # a lazy scope keeps the tokens from its lcurly to its rcurly
+            start, end = scope.span
+            return ("lazy", tuple(self.token(token) for token in scope.tokens[start : end]))
+        return ("scope", tuple(stmt.visit(self) for stmt in scope.stmts))
+
+    def visitDeclaration(self, decl):
+        """visit a declaration node"""
+        expr = decl.expr.visit(self) if decl.expr else None
+        return ("let", self.token(decl.name), expr)
+
+    def visitIf(self, ifa):
+        """visit a if node"""
+        return ("if", ifa.condition.visit(self), ifa.scope.visit(self))
+
+    def visitWhile(self, whilea):
+        """visit a while node"""
+        return ("while", whilea.condition.visit(self), whilea.scope.visit(self))
+
+    def visitPrint(self, p):
+        """visit a print node"""
+        return ("print", p.expr.visit(self))
+
+    def visitLoad(self, load):
+        """visit a load node"""
+        return ("load", load.expr.visit(self))
+
+    def visitExec(self, exe):
+        """visit a exec node"""
+        return ("exec", exe.expr.visit(self))
+
+    def visitAssign(self, assign):
+        """visit an assign node"""
+        return ("assign", self.token(assign.name), assign.expr.visit(self))
+
+    def visitBinary(self, binary):
+        """visit a binary expression"""
+        return ("binary", self.token(binary.operator), binary.left.visit(self), binary.right.visit(self))
+
+    def visitUnary(self, unary):
+        """visit a unary expression"""
+        return ("unary", self.token(unary.operator), unary.expr.visit(self))
+
+    def visitLiteral(self, literal):
+        """visit a literal node"""
+        return ("literal", self.token(literal.value))
+
+
+class Decoder(object):
+    """this class builds the ast from the data of the Encoder
+
+    lists are accepted for tuples, like json returns them. data that was
+    not created by the Encoder raises a ValueError"""
+
+    def __init__(self, data):
+        self.data = data
+
+        # the method building each node
+        self.nodes = {
+            "scope": self.scope, "lazy": self.lazy, "let": self.declaration,
+            "if": self.ifa, "while": self.whilea, "print": self.print,
+            "load": self.load, "exec": self.exe, "assign": self.assign,
+            "binary": self.binary, "unary": self.unary, "literal": self.literal,
+        }
+
+    def decode(self):
+        """return the ast of the data"""
+        return self.node(self.data)
+
+    def node(self, data):
+        """build a single node"""
+        try:
+            return self.nodes[data[0]](*data[1:])
+        except (KeyError, IndexError, TypeError) as err:
+            raise ValueError("invalid ast data") from err
+
+    def token(self, data):
+        """build a single token"""
+        kind, value, line, start, end = data
+        if(type(value) not in (int, str, type(None))):
+            raise ValueError("invalid token data")
+        return Token(Kind(kind), line, value, start, end)
+
+    def scope(self, stmts):
+        ast = Scope()
+        for stmt in stmts:
+            ast.add(self.node(stmt))
+        return ast
+
+    def lazy(self, tokens):
+        # the tokens of the scope are parsed when it runs
+        ast = Scope()
+        ast.tokens = [self.token(token) for token in tokens]
+        ast.tokens.append(Token(Kind.EOF))
+        ast.span = (0, len(tokens))
+        return ast
+
+    def declaration(self, name, expr):
+        return Declaration(self.token(name), self.node(expr) if expr else None)
+
+    def ifa(self, condition, scope):
+        return If(self.node(condition), self.node(scope))
+
+    def whilea(self, condition, scope):
+        return While(self.node(condition), self.node(scope))
+
+    def print(self, expr):
+        return Print(self.node(expr))
+
+    def load(self, expr):
+        return Load(self.node(expr))
+
+    def exe(self, expr):
+        return Exec(self.node(expr))
+
+    def assign(self, name, expr):
+        return Assign(self.token(name), self.node(expr))
+
+    def binary(self, operator, left, right):
+        return Binary(self.token(operator), self.node(left), self.node(right))
+
+    def unary(self, operator, expr):
+        return Unary(self.token(operator), self.node(expr))
+
+    def literal(self, value):
+        return Literal(self.token(value))
@@ -31,4 +31,33 @@ class FileCouldNotBeLoaded(Error):
         self.name = name
 
     def __str__(self):
-        return "The file \"%s\" was not found" % (self.name)
\ No newline at end of file
+        return "The file \"%s\" was not found" % (self.name)
+
+class TypeMismatchError(Error):
+    """error when an operator is applied to values of the wrong types"""
+
+    def __init__(self, operator, *types):
+        self.operator = operator
+        self.types = types
+
+    def __str__(self):
+        names = " and ".join(t.name.lower() for t in self.types)
+        return "The operator %s can not be applied to %s" % (self.operator.kind.name, names)
+
+class ArtifactError(Error):
+    """error when a file is not a linked artifact"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __str__(self):
+        return "The file \"%s\" is not a linked artifact" % (self.name)
+
+class UnsupportedError(Error):
+    """error when a backend does not support a statement"""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __str__(self):
+        return "The %s is not supported by this backend" % (self.name)
\ No newline at end of file
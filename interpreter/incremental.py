@@ -0,0 +1,283 @@
+from .token import Kind, Token
+from .lexer import Lexer
+from .parser import Parser
+from .ast import *
+from .error import ParseError
+
+class IncrementalParser(object):
+    """this class keeps the tokens and the ast of a code up to date while
+    the code is edited
+
+    only the tokens around an edit are lexed again and only the statements
+    containing changed tokens are parsed again, all other tokens and
+    statements are reused.
+
+    the positions behind the last edit are stored relative to the end, so
+    an edit does not have to move them. the tokens from gap on store their
+    offsets relative to the length of the code and their line relative to
+    the number of lines. the spans of the statements store the index of
+    their first and last token, negative ones are relative to the number
+    of tokens. use position and span to get the absolute values"""
+
+    def __init__(self, code):
+        self.code = code
+        self.tokens = None
+        self.root = None
+        self.reset()
+
+    def reset(self):
+        """lex and parse the complete code"""
+        self.tokens = None
+        self.root = None
+        self.tokens = Lexer(self.code).lexTokens()
+        self.lines = self.tokens[-1].line
+        self.gap = len(self.tokens)
+        self.root = self.parseRoot()
+
+        # all positions start relative, so the first edit only has to make
+        # the tokens in front of it absolute
+        self.move(0)
+
+    def parseRoot(self):
+        """parse all tokens into a scope spanning the complete code"""
+        p = Parser(self.tokens)
+        root = Scope()
+        while(p.has()):
+            root.add(self.encode(p.parseStatement()))
+        p.consume(Kind.EOF)
+        return root
+
+    @property
+    def ast(self):
+        """return the ast like Parser.parse would"""
+        if(len(self.root.stmts) == 1):
+            return self.root.stmts[0]
+        return self.root
+
+    def position(self, index):
+        """return the start, end and line of a token"""
+        token = self.tokens[index]
+        if(index < self.gap):
+            return (token.start, token.end, token.line)
+        length = len(self.code)
+        return (token.start + length, token.end + length, token.line + self.lines)
+
+    def span(self, stmt, count = None):
+        """return the token range of a statement, count is the number of
+        tokens the relative indices refer to"""
+        count = len(self.tokens) if count is None else count
+        if(stmt is self.root):
+            # the root spans all tokens up to the end of file token
+            return (0, count - 1)
+
+        start, last = stmt.span
+        if(start < 0):
+            start += count
+        if(last < 0):
+            last += count
+        return (start, last + 1)
+
+    def encode(self, stmt):
+        """store the span of a parsed statement and its scopes as the
+        indices of the first and last token, relative behind the gap"""
+        count = len(self.tokens)
+        start, end = stmt.span
+        stmt.span = tuple(index if index < self.gap else index - count for index in (start, end - 1))
+        for child in self.children(stmt):
+            self.encode(child)
+        return stmt
+
+    def children(self, stmt):
+        """return the statements and scopes directly inside of stmt"""
+        if(isinstance(stmt, Scope)):
+            return stmt.stmts
+        elif(isinstance(stmt, (If, While))):
+            return [stmt.scope]
+        return []
+
+    def edit(self, offset, removed, inserted):
+        """replace removed characters at offset with the inserted text and
+        return the new ast"""
+        code = self.code[:offset] + inserted + self.code[offset + removed:]
+
+        # a previous edit left the code invalid, start from scratch
+        if(self.tokens is None or self.root is None):
+            self.code = code
+            self.reset()
+            return self.ast
+
+        try:
+            # the tokens behind the first changed one move with the end
+            first = self.find(offset)
+            self.move(first)
+            self.code = code
+            oldEnd, newEnd = self.relex(first, offset + len(inserted))
+
+            # nothing has to be parsed if the tokens did not change
+            if(first == oldEnd and first == newEnd):
+                return self.ast
+
+            # parse everything again if no scope could contain the changes
+            if(not self.reparse(self.root, first, oldEnd, newEnd)):
+                self.root = self.parseRoot()
+            return self.ast
+        except Exception:
+            # the code is invalid, the next edit starts from scratch
+            self.code = code
+            self.tokens = None
+            self.root = None
+            raise
+
+    def find(self, offset):
+        """return the index of the first token ending at or behind offset"""
+        low = 0
+        high = len(self.tokens)
+        while(low < high):
+            middle = (low + high) // 2
+            if(self.position(middle)[1] < offset):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def move(self, gap):
+        """move the gap to a token index, the positions in between change
+        between absolute and relative"""
+        low, high = sorted((gap, self.gap))
+        relative = gap < self.gap
+        length = len(self.code) if relative else -len(self.code)
+        lines = self.lines if relative else -self.lines
+        for token in self.tokens[low : high]:
+            token.start -= length
+            token.end -= length
+            token.line -= lines
+
+        self.moveSpans(self.root, low, high, relative)
+        self.gap = gap
+
+    def moveSpans(self, stmt, low, high, relative):
+        """change the token indices from low to high of the statements inside
+        of stmt between absolute and relative"""
+        count = len(self.tokens)
+        children = self.children(stmt)
+
+        # skip the statements ending before low
+        for child in children[self.skip(children, low, count):]:
+            start, end = self.span(child)
+            if(start >= high):
+                break
+
+            # the first and last token are converted on their own
+            child.span = tuple(self.convert(index, count, low, high, relative)
+                               for index in (start, end - 1))
+            self.moveSpans(child, low, high, relative)
+
+    def skip(self, stmts, index, count):
+        """return the position of the first statement ending behind the
+        token index, count is the number of tokens the spans refer to"""
+        low = 0
+        high = len(stmts)
+        while(low < high):
+            middle = (low + high) // 2
+            if(self.span(stmts[middle], count)[1] <= index):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def convert(self, index, count, low, high, relative):
+        """return the stored form of a token index after moving the gap"""
+        if(index < low or index >= high):
+            return index if index < low else index - count
+        return index - count if relative else index
+
+    def relex(self, first, end):
+        """lex the tokens changed by an edit ending at end and splice them
+        into the token list, returns the old and new end of the range"""
+        tokens = self.tokens
+
+        # start lexing behind the previous token which is unchanged
+        lexer = Lexer(self.code)
+        if(first > 0):
+            lexer.index = tokens[first - 1].end
+            lexer.line = tokens[first - 1].line
+
+        # lex until the lexer reaches the start of an old token behind the edit
+        old = first
+        while(True):
+            while(self.position(old)[0] < lexer.index and tokens[old].kind != Kind.EOF):
+                old += 1
+            if(lexer.index >= end and lexer.index == self.position(old)[0]):
+                break
+
+            lexer.start = lexer.index
+            lexer.lexToken()
+
+        # the reused tokens keep their place relative to the end
+        self.lines += lexer.line - self.position(old)[2]
+        self.count = len(tokens)
+        tokens[first:old] = lexer.tokens
+        self.gap = first + len(lexer.tokens)
+        return (old, self.gap)
+
+    def reparse(self, scope, first, oldEnd, newEnd):
+        """parse the statements of scope that contain the tokens from first
+        to oldEnd again, returns False if the scope has to be parsed by the
+        enclosing scope"""
+        stmts = scope.stmts
+
+        # find the statements which contain changed tokens, before the edit
+        low = self.skip(stmts, first, self.count)
+        high = low
+        while(high < len(stmts) and self.span(stmts[high], self.count)[0] < oldEnd):
+            high += 1
+
+        # if a single scope contains all changes only parse inside it
+        if(high == low + 1):
+            stmt = stmts[low]
+            body = stmt if isinstance(stmt, Scope) else getattr(stmt, "scope", None)
+            if(body):
+                start, end = self.span(body, self.count)
+                if(start < first and end - 1 >= oldEnd and self.reparse(body, first, oldEnd, newEnd)):
+                    return True
+
+        # the closing token of this scope after the edit
+        close = self.span(scope)[1]
+        if(scope is not self.root):
+            close -= 1
+
+        p = Parser(self.tokens)
+        p.index = min(self.span(stmts[low], self.count)[0], first) if low < high else first
+        parsed = []
+        reused = high
+        try:
+            while(True):
+                # stop at an old statement that starts behind the changes
+                while(reused < len(stmts) and self.span(stmts[reused])[0] < p.index):
+                    reused += 1
+                if(p.index >= newEnd and reused < len(stmts) and self.span(stmts[reused])[0] == p.index):
+                    break
+
+                # or stop at the end of the scope
+                if(p.index == close):
+                    reused = len(stmts)
+                    break
+                if(p.index > close or not p.has()):
+                    return False
+
+                parsed.append(p.parseStatement())
+        except ParseError:
+            return False
+
+        # only look at all statements again if a declaration was removed
+        removed = stmts[low:reused]
+        stmts[low:reused] = [self.encode(stmt) for stmt in parsed]
+        if(self.declares(parsed)):
+            scope.declares = True
+        elif(self.declares(removed)):
+            scope.update()
+        return True
+
+    def declares(self, stmts):
+        """return True if one of the statements needs a frame"""
+        return any(isinstance(stmt, (Declaration, Load, Exec)) for stmt in stmts)
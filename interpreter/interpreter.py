@@ -2,62 +2,100 @@ from .ast import *
 from .token import Kind, Token
 from .parser import Parser
 from .lexer import Lexer
+from .typecheck import TypeChecker, Mode
+from .loader import FileLoader
+from .optimizer import Optimizer
+from .symbol import symbols
 from .error import NameNotFoundError, FileCouldNotBeLoaded
 
 class Environment(object):
-    """this class is the environment for a interpreter"""
+    """this class is the environment for a interpreter
+
+    the frames map the symbol ids of the variables to their values"""
 
     def __init__(self):
         self.stack = [{}]
 
+        # popped frames, they are cleared and reused by push
+        self.pool = []
+
+        # the number of frames that were allocated
+        self.allocated = 1
+
     def push(self):
         """push a new stack frame"""
-        self.stack.append({})
+        if(self.pool):
+            self.stack.append(self.pool.pop())
+        else:
+            self.allocated += 1
+            self.stack.append({})
 
     def pop(self):
         """pop a stack frame"""
-        self.stack.pop()
+        frame = self.stack.pop()
+        frame.clear()
+        self.pool.append(frame)
 
-    def getValue(self, name):
+    def getValue(self, symbol):
         """get the value, searching all stack frames"""
         for frame in reversed(self.stack):
-            if(name in frame):
-                return frame[name]
-        raise NameNotFoundError(name)
+            if(symbol in frame):
+                return frame[symbol]
+        raise NameNotFoundError(symbols.name(symbol))
 
-    def setValue(self, name, value):
+    def setValue(self, symbol, value):
         """set a value, searching all stack frames"""
         for frame in reversed(self.stack):
-            if(name in frame):
-                frame[name] = value
+            if(symbol in frame):
+                frame[symbol] = value
                 return
-        raise NameNotFoundError(name)
+        raise NameNotFoundError(symbols.name(symbol))
 
-    def initValue(self, name):
+    def initValue(self, symbol):
         """init a variable in the current frame"""
-        self.stack[-1][name] = None
+        self.stack[-1][symbol] = None
 
 
 class Interpreter(object):
     """this class interpretes an ast using an environment for variables
     
     this class uses a visitor pattern to access the ast"""
-    def __init__(self, ast, env):
+    def __init__(self, ast, env, loader = None):
         self.ast = ast
         self.env = env
 
+        # the loader provides the ast of loaded files
+        self.loader = loader or FileLoader()
+
     def eval(self):
         """eval the ast returning its result or None"""
         return self.ast.visit(self)
 
     def visitScope(self, scope):
         """visit a scope node"""
+
+        # lazy scopes are parsed when they run for the first time
+        if(scope.tokens is not None):
+            self.expand(scope)
+
+        # scopes without declarations do not need a frame
+        if(not scope.declares):
+            for stmt in scope.stmts:
+                stmt.visit(self)
+            return None
+
         self.env.push()
         for stmt in scope.stmts:
             r = stmt.visit(self)
         self.env.pop()
         return None
 
+    def expand(self, scope):
+        """parse, check and optimize the statements of a lazy scope"""
+        Parser(scope.tokens, True).expand(scope)
+        Optimizer(TypeChecker(scope).check()).optimize()
+        self.loader.prefetch(scope)
+
     def visitIf(self, ifa):
         """visit a if node"""
         if(ifa.condition.visit(self)):
@@ -81,15 +119,15 @@ class Interpreter(object):
         # calculate the expression for the filename
         name = load.expr.visit(self)
         try:
-            with open(name) as f:
-                # lex, parse, interprete the file
-                l = Lexer(f.read())
-                p = Parser(l.lexTokens())
-                i = Interpreter(p.parse(), self.env)
-                return i.eval()
+            # get the parsed file from the loader
+            ast = self.loader.load(name)
         except FileNotFoundError:
             raise FileCouldNotBeLoaded(name)
-        return None
+
+        # check, optimize, interprete the file
+        ast = Optimizer(TypeChecker(ast).check()).optimize()
+        i = Interpreter(ast, self.env, self.loader)
+        return i.eval()
 
     def visitExec(self, exe):
         """visit a exec node"""
@@ -97,28 +135,30 @@ class Interpreter(object):
         # calculate the expression for the code
         expr = exe.expr.visit(self)
 
-        # lex, parse, interprete the code
+        # lex, parse, check, optimize, interprete the code
         l = Lexer(expr)
         p = Parser(l.lexTokens())
-        i = Interpreter(p.parse(), self.env)
+        ast = Optimizer(TypeChecker(p.parse()).check()).optimize()
+        ast = self.loader.prefetch(ast)
+        i = Interpreter(ast, self.env, self.loader)
         return i.eval()
 
     def visitAssign(self, assign):
         """visit an assign node"""
 
         # set the value using the environment
-        self.env.setValue(assign.name.value, assign.expr.visit(self))
+        self.env.setValue(assign.name.symbol, assign.expr.visit(self))
         return None
 
     def visitDeclaration(self, decl):
         """visit a declaration node"""
 
         # init the variable using the environment
-        self.env.initValue(decl.name.value)
+        self.env.initValue(decl.name.symbol)
 
         # set the value if present
         if(decl.expr):
-            self.env.setValue(decl.name.value, decl.expr.visit(self))
+            self.env.setValue(decl.name.symbol, decl.expr.visit(self))
         return None
 
     def visitBinary(self, binary):
@@ -130,6 +170,14 @@ class Interpreter(object):
 
         # choose which operator to use
         if(binary.operator.kind == Kind.PLUS):
+            # use the operand types found by the type checker
+            if(binary.mode == Mode.INTINT or binary.mode == Mode.STRSTR):
+                return left + right
+            elif(binary.mode == Mode.STRINT):
+                return left + str(right)
+            elif(binary.mode == Mode.INTSTR):
+                return str(left) + right
+
             # allow for string concatenation
             if(type(left) == str and type(right) == int):
                 return left + str(right)
@@ -185,5 +233,5 @@ class Interpreter(object):
             return False
         elif(literal.value.kind == Kind.IDENT):
             # get the value from the environment
-            return self.env.getValue(literal.value.value)
+            return self.env.getValue(literal.value.symbol)
         return None
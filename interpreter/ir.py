@@ -0,0 +1,445 @@
+from enum import Enum
+from itertools import count
+from .ast import *
+from .token import Kind, Token
+from .typecheck import Type
+from .symbol import symbols
+from .error import UnsupportedError
+
+class Op(Enum):
+    """This enum describes the different ir instructions"""
+
+    CONST = 1
+    PHI = 2
+    COPY = 3
+    BINARY = 4
+    UNARY = 5
+
+    GETGLOBAL = 6
+    SETGLOBAL = 7
+    INITGLOBAL = 8
+    PRINT = 9
+
+    JUMP = 10
+    BRANCH = 11
+    RETURN = 12
+
+
+class Instr(object):
+    """This class is a single instruction, it is also the ssa value it defines
+
+    the value is the constant, the operator or the symbol id of a global"""
+
+    # instructions that end a block
+    terminators = (Op.JUMP, Op.BRANCH, Op.RETURN)
+
+    # the numbers of the instructions
+    numbers = count()
+
+    def __init__(self, op, args = (), value = None):
+        self.id = next(self.numbers)
+        self.op = op
+        self.args = list(args)
+        self.value = value
+        self.targets = []
+        self.block = None
+
+        # true if the instruction can not raise an error
+        self.safe = op in (Op.CONST, Op.PHI, Op.COPY, Op.JUMP, Op.BRANCH, Op.RETURN)
+
+    def pure(self):
+        """check if the instruction can be removed when its value is unused"""
+        return self.safe and self.op not in self.terminators and self.op != Op.PRINT
+
+    def __repr__(self):
+        return "%%%d" % (self.id)
+
+    def dump(self):
+        """return the instruction as text"""
+        text = "%s = %s" % (self, self.op.name.lower())
+        if(self.op == Op.BINARY or self.op == Op.UNARY):
+            text += " %s" % (self.value.kind.name)
+        elif(self.op in (Op.GETGLOBAL, Op.SETGLOBAL, Op.INITGLOBAL)):
+            text += " %s" % (symbols.name(self.value))
+        elif(self.value is not None or self.op == Op.CONST):
+            text += " %r" % (self.value,)
+        if(self.args):
+            text += " " + ", ".join(repr(arg) for arg in self.args)
+        if(self.targets):
+            text += " -> " + ", ".join("b%d" % target.id for target in self.targets)
+        return text
+
+
+class Block(object):
+    """This class is a basic block, phis come first and a terminator last"""
+
+    def __init__(self, id):
+        self.id = id
+        self.instrs = []
+        self.preds = []
+
+    def add(self, instr):
+        """append an instruction, returning it"""
+        instr.block = self
+        self.instrs.append(instr)
+        return instr
+
+    def phis(self):
+        """return the phi instructions"""
+        return [instr for instr in self.instrs if instr.op == Op.PHI]
+
+    def terminator(self):
+        """return the last instruction"""
+        return self.instrs[-1]
+
+    def succs(self):
+        """return the successors"""
+        return self.terminator().targets
+
+    def __repr__(self):
+        return "b%d" % (self.id)
+
+
+class Function(object):
+    """This class contains the control flow graph of a program"""
+
+    def __init__(self):
+        self.blocks = []
+
+    def block(self):
+        """create a new block"""
+        block = Block(len(self.blocks))
+        self.blocks.append(block)
+        return block
+
+    def instrs(self):
+        """return all instructions"""
+        return [instr for block in self.blocks for instr in block.instrs]
+
+    def uses(self):
+        """return the users of every instruction"""
+        users = {instr: [] for instr in self.instrs()}
+        for instr in self.instrs():
+            for arg in instr.args:
+                users[arg].append(instr)
+        return users
+
+    def __repr__(self):
+        lines = []
+        for block in self.blocks:
+            lines.append("%s: preds %s" % (block, block.preds))
+            lines.extend("    " + instr.dump() for instr in block.instrs)
+        return "\n".join(lines)
+
+
+class Variable(object):
+    """This class is a variable declared by the program"""
+
+    def __init__(self, name):
+        self.name = name
+
+
+class Lowering(object):
+    """this class lowers an ast to a control flow graph in ssa form
+
+    every declaration is a new variable, so shadowing is resolved while
+    lowering. variables of the environment are accessed with globals.
+    the ssa construction follows Braun et al., phis are placed when a
+    variable is read in a block with several predecessors.
+    this class uses a visitor pattern to access the ast"""
+
+    def __init__(self, ast):
+        self.ast = ast
+        self.function = Function()
+        self.current = None
+
+        # the variables visible by name, one dict per scope
+        self.scopes = [{}]
+
+        # the value of each variable at the end of each block
+        self.defs = {}
+
+        # blocks whose predecessors are all known, and the phis of the others
+        self.sealed = set()
+        self.incomplete = {}
+
+    def lower(self):
+        """lower the ast, returning the function"""
+        self.current = self.function.block()
+        self.seal(self.current)
+
+        # a single declaration declares into the environment
+        if(isinstance(self.ast, Declaration)):
+            self.emit(Op.INITGLOBAL, value = self.ast.name.symbol)
+            if(self.ast.expr):
+                self.emit(Op.SETGLOBAL, [self.ast.expr.visit(self)], self.ast.name.symbol)
+        else:
+            self.ast.visit(self)
+
+        self.emit(Op.RETURN)
+        return self.function
+
+    def emit(self, op, args = (), value = None):
+        """append an instruction to the current block"""
+        return self.current.add(Instr(op, args, value))
+
+    def jump(self, target):
+        """end the current block with a jump to target"""
+        self.emit(Op.JUMP).targets = [target]
+        target.preds.append(self.current)
+
+    def branch(self, condition, true, false):
+        """end the current block with a conditional branch"""
+        self.emit(Op.BRANCH, [condition]).targets = [true, false]
+        true.preds.append(self.current)
+        false.preds.append(self.current)
+
+    def find(self, name):
+        """return the variable with the name, or None for a global"""
+        for scope in reversed(self.scopes):
+            if(name in scope):
+                return scope[name]
+        return None
+
+    def write(self, var, block, value):
+        """set the value of a variable in a block"""
+        self.defs.setdefault(var, {})[block] = value
+
+    def read(self, var, block):
+        """return the value of a variable in a block"""
+        if(block in self.defs.get(var, {})):
+            return self.defs[var][block]
+
+        if(block not in self.sealed):
+            # the operands are added when the block is sealed
+            value = self.phi(block)
+            self.incomplete.setdefault(block, []).append((var, value))
+        elif(len(block.preds) == 1):
+            value = self.read(var, block.preds[0])
+        else:
+            # a phi breaks cycles in loops
+            value = self.phi(block)
+            self.write(var, block, value)
+            self.operands(var, value)
+        self.write(var, block, value)
+        return value
+
+    def phi(self, block):
+        """insert a phi at the start of the block"""
+        instr = Instr(Op.PHI)
+        instr.block = block
+        block.instrs.insert(0, instr)
+        return instr
+
+    def operands(self, var, phi):
+        """add an operand for every predecessor to the phi"""
+        for pred in phi.block.preds:
+            phi.args.append(self.read(var, pred))
+
+    def seal(self, block):
+        """mark that all predecessors of the block are known"""
+        for var, phi in self.incomplete.pop(block, []):
+            self.operands(var, phi)
+        self.sealed.add(block)
+
+    def visitScope(self, scope):
+        """visit a scope node"""
+        if(scope.tokens is not None):
+            raise UnsupportedError("lazy scope")
+
+        self.scopes.append({})
+        for stmt in scope.stmts:
+            stmt.visit(self)
+        self.scopes.pop()
+
+    def visitIf(self, ifa):
+        """visit a if node"""
+        condition = ifa.condition.visit(self)
+        then = self.function.block()
+        join = self.function.block()
+        self.branch(condition, then, join)
+        self.seal(then)
+
+        self.current = then
+        ifa.scope.visit(self)
+        self.jump(join)
+
+        self.seal(join)
+        self.current = join
+
+    def visitWhile(self, whilea):
+        """visit a while node"""
+        header = self.function.block()
+        body = self.function.block()
+        exit = self.function.block()
+        self.jump(header)
+
+        # the header is sealed after the body jumped back
+        self.current = header
+        condition = whilea.condition.visit(self)
+        self.branch(condition, body, exit)
+        self.seal(body)
+
+        self.current = body
+        whilea.scope.visit(self)
+        self.jump(header)
+        self.seal(header)
+
+        self.seal(exit)
+        self.current = exit
+
+    def visitPrint(self, p):
+        """visit a print node"""
+        self.emit(Op.PRINT, [p.expr.visit(self)])
+
+    def visitLoad(self, load):
+        """visit a load node, the loaded code is not known"""
+        raise UnsupportedError("load statement")
+
+    def visitExec(self, exe):
+        """visit a exec node, the executed code is not known"""
+        raise UnsupportedError("exec statement")
+
+    def visitAssign(self, assign):
+        """visit an assign node"""
+        value = assign.expr.visit(self)
+        var = self.find(assign.name.value)
+        if(var is None):
+            self.emit(Op.SETGLOBAL, [value], assign.name.symbol)
+        else:
+            self.write(var, self.current, self.emit(Op.COPY, [value]))
+
+    def visitDeclaration(self, decl):
+        """visit a declaration node"""
+
+        # the variable is declared before the expression is evaluated
+        var = Variable(decl.name.value)
+        self.scopes[-1][var.name] = var
+        self.write(var, self.current, self.emit(Op.CONST, value = None))
+
+        if(decl.expr):
+            value = decl.expr.visit(self)
+            self.write(var, self.current, self.emit(Op.COPY, [value]))
+
+    def visitBinary(self, binary):
+        """visit a binary expression"""
+        left = binary.left.visit(self)
+        right = binary.right.visit(self)
+        instr = self.emit(Op.BINARY, [left, right], binary.operator)
+
+        # the type checker proved the operand types
+        instr.safe = self.known(binary, binary.left, binary.right)
+        return instr
+
+    def visitUnary(self, unary):
+        """visit a unary expression"""
+        instr = self.emit(Op.UNARY, [unary.expr.visit(self)], unary.operator)
+        instr.safe = self.known(unary, unary.expr)
+        return instr
+
+    def known(self, *exprs):
+        """check if the type checker found the types of all expressions"""
+        return all(expr.type not in (None, Type.UNKNOWN) for expr in exprs)
+
+    def visitLiteral(self, literal):
+        """visit a literal node"""
+        kind = literal.value.kind
+        if(kind in [Kind.NUMBER, Kind.STRING]):
+            return self.emit(Op.CONST, value = literal.value.value)
+        elif(kind == Kind.TRUE):
+            return self.emit(Op.CONST, value = True)
+        elif(kind == Kind.FALSE):
+            return self.emit(Op.CONST, value = False)
+
+        var = self.find(literal.value.value)
+        if(var is None):
+            return self.emit(Op.GETGLOBAL, value = literal.value.symbol)
+        return self.read(var, self.current)
+
+
+def binary(kind, left, right):
+    """apply a binary operator like the interpreter does"""
+    if(kind == Kind.PLUS):
+        # allow for string concatenation
+        if(type(left) == str and type(right) == int):
+            return left + str(right)
+        elif(type(left) == int and type(right) == str):
+            return str(left) + right
+        return left + right
+    elif(kind == Kind.MINUS):
+        return left - right
+    elif(kind == Kind.MULT):
+        return left * right
+    elif(kind == Kind.DIV):
+        return left / right
+    elif(kind == Kind.CMPEQ):
+        return left == right
+    elif(kind == Kind.CMPNOTEQ):
+        return left != right
+    elif(kind == Kind.CMPLESS):
+        return left < right
+    elif(kind == Kind.CMPLESSEQ):
+        return left <= right
+    elif(kind == Kind.CMPGREATER):
+        return left > right
+    elif(kind == Kind.CMPGREATEREQ):
+        return left >= right
+    return None
+
+def unary(kind, expr):
+    """apply a unary operator like the interpreter does"""
+    if(kind == Kind.MINUS):
+        return - expr
+    elif(kind == Kind.BANG):
+        return not expr
+    elif(kind == Kind.PLUS):
+        return expr
+    return None
+
+
+class IRInterpreter(object):
+    """this class runs a function using an environment for the globals"""
+
+    def __init__(self, function, env):
+        self.function = function
+        self.env = env
+
+    def eval(self):
+        """run the function, returning None"""
+        values = {}
+        block = self.function.blocks[0]
+        pred = None
+        while(True):
+            # all phis take their value from the edge at the same time
+            phis = block.phis()
+            if(phis):
+                index = block.preds.index(pred)
+                incoming = [values[phi.args[index]] for phi in phis]
+                for phi, value in zip(phis, incoming):
+                    values[phi] = value
+
+            for instr in block.instrs[len(phis):]:
+                op = instr.op
+                if(op == Op.CONST):
+                    values[instr] = instr.value
+                elif(op == Op.COPY):
+                    values[instr] = values[instr.args[0]]
+                elif(op == Op.BINARY):
+                    values[instr] = binary(instr.value.kind, values[instr.args[0]], values[instr.args[1]])
+                elif(op == Op.UNARY):
+                    values[instr] = unary(instr.value.kind, values[instr.args[0]])
+                elif(op == Op.GETGLOBAL):
+                    values[instr] = self.env.getValue(instr.value)
+                elif(op == Op.SETGLOBAL):
+                    self.env.setValue(instr.value, values[instr.args[0]])
+                elif(op == Op.INITGLOBAL):
+                    self.env.initValue(instr.value)
+                elif(op == Op.PRINT):
+                    print(values[instr.args[0]])
+                elif(op == Op.JUMP):
+                    pred, block = block, instr.targets[0]
+                elif(op == Op.BRANCH):
+                    target = instr.targets[0 if values[instr.args[0]] else 1]
+                    pred, block = block, target
+                elif(op == Op.RETURN):
+                    return None
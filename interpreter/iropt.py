@@ -0,0 +1,214 @@
+from .ir import Op, Instr, binary, unary
+from .token import Kind
+
+class IROptimizer(object):
+    """this class optimizes a function in ssa form
+
+    the passes are sparse conditional constant propagation, copy
+    propagation and dead store elimination"""
+
+    # the lattice values of the constant propagation besides constants
+    top = object()
+    bottom = object()
+
+    def __init__(self, function):
+        self.function = function
+
+    def optimize(self):
+        """run all passes, returning the function"""
+        self.propagateConstants()
+        self.propagateCopies()
+        self.eliminateDeadStores()
+        return self.function
+
+    def meet(self, first, second):
+        """combine two lattice values, constants are tuples"""
+        if(first is self.top):
+            return second
+        elif(second is self.top):
+            return first
+        elif(first is self.bottom or second is self.bottom):
+            return self.bottom
+
+        # True and 1 are equal but not printed the same
+        if(type(first[0]) == type(second[0]) and first[0] == second[0]):
+            return first
+        return self.bottom
+
+    def evaluate(self, instr, lattice, edges):
+        """return the lattice value of an instruction"""
+        op = instr.op
+        if(op == Op.CONST):
+            return (instr.value,)
+        elif(op == Op.COPY):
+            return lattice.get(instr.args[0], self.top)
+        elif(op == Op.PHI):
+            value = self.top
+            for pred, arg in zip(instr.block.preds, instr.args):
+                if((pred, instr.block) in edges):
+                    value = self.meet(value, lattice.get(arg, self.top))
+            return value
+        elif(op == Op.BINARY or op == Op.UNARY):
+            args = [lattice.get(arg, self.top) for arg in instr.args]
+            if(self.top in args):
+                return self.top
+            if(self.bottom in args):
+                return self.bottom
+
+            # a repeated string can take any amount of memory, it is only
+            # built if the code runs
+            if(op == Op.BINARY and instr.value.kind == Kind.MULT and str in (type(args[0][0]), type(args[1][0]))):
+                return self.bottom
+            try:
+                if(op == Op.BINARY):
+                    return (binary(instr.value.kind, args[0][0], args[1][0]),)
+                return (unary(instr.value.kind, args[0][0]),)
+            except Exception:
+                # the error has to happen at runtime
+                return self.bottom
+        return self.bottom
+
+    def propagateConstants(self):
+        """find constant values and branches with sparse conditional
+        constant propagation, then fold them"""
+        function = self.function
+        users = function.uses()
+        lattice = {}
+        edges = set()
+        reached = set()
+
+        # the edges and instructions to visit
+        flow = [(None, function.blocks[0])]
+        values = []
+        while(flow or values):
+            if(flow):
+                pred, block = flow.pop()
+                if((pred, block) in edges):
+                    continue
+                edges.add((pred, block))
+
+                # the phis see a new edge, the rest is only visited once
+                visit = block.phis() if block in reached else block.instrs
+                reached.add(block)
+            else:
+                instr = values.pop()
+                if(instr.block not in reached):
+                    continue
+                visit = [instr]
+
+            for instr in visit:
+                if(instr.op == Op.JUMP):
+                    flow.append((instr.block, instr.targets[0]))
+                elif(instr.op == Op.BRANCH):
+                    condition = lattice.get(instr.args[0], self.top)
+                    if(condition is self.bottom):
+                        flow.extend((instr.block, target) for target in instr.targets)
+                    elif(condition is not self.top):
+                        target = instr.targets[0 if condition[0] else 1]
+                        flow.append((instr.block, target))
+                elif(instr.op not in Instr.terminators):
+                    value = self.evaluate(instr, lattice, edges)
+                    if(value != lattice.get(instr, self.top)):
+                        lattice[instr] = value
+                        values.extend(users[instr])
+
+        # fold the constants, keeping the phis first
+        for block in function.blocks:
+            if(block not in reached):
+                continue
+            for instr in block.instrs:
+                value = lattice.get(instr, self.top)
+                if(instr.op in (Op.PHI, Op.COPY, Op.BINARY, Op.UNARY) and isinstance(value, tuple)):
+                    instr.op = Op.CONST
+                    instr.args = []
+                    instr.value = value[0]
+                    instr.safe = True
+            block.instrs = block.phis() + [instr for instr in block.instrs if instr.op != Op.PHI]
+
+            # a branch on a constant becomes a jump
+            last = block.terminator()
+            if(last.op == Op.BRANCH and isinstance(lattice.get(last.args[0]), tuple)):
+                taken = last.targets[0 if lattice[last.args[0]][0] else 1]
+                for target in last.targets:
+                    if(target is not taken):
+                        self.unlink(block, target)
+                last.op = Op.JUMP
+                last.args = []
+                last.targets = [taken]
+
+        # remove the blocks that can never run
+        for block in function.blocks:
+            if(block not in reached):
+                for target in block.succs():
+                    if(target in reached):
+                        self.unlink(block, target)
+        function.blocks = [block for block in function.blocks if block in reached]
+        for index, block in enumerate(function.blocks):
+            block.id = index
+
+    def unlink(self, pred, block):
+        """remove the edge from pred to block"""
+        index = block.preds.index(pred)
+        del block.preds[index]
+        for phi in block.phis():
+            del phi.args[index]
+
+    def propagateCopies(self):
+        """replace copies and phis of a single value by that value"""
+        forward = {}
+
+        def resolve(value):
+            while(value in forward):
+                value = forward[value]
+            return value
+
+        changed = True
+        while(changed):
+            changed = False
+            for block in self.function.blocks:
+                for instr in list(block.instrs):
+                    if(instr.op == Op.COPY):
+                        forward[instr] = resolve(instr.args[0])
+                    elif(instr.op == Op.PHI):
+                        args = set(resolve(arg) for arg in instr.args) - {instr}
+                        if(len(args) != 1):
+                            continue
+                        forward[instr] = args.pop()
+                    else:
+                        continue
+                    block.instrs.remove(instr)
+                    changed = True
+
+        for instr in self.function.instrs():
+            instr.args = [resolve(arg) for arg in instr.args]
+
+    def eliminateDeadStores(self):
+        """remove globals that are set again before anything can see them,
+        and values that are never used"""
+        for block in self.function.blocks:
+            # the last set of a global, while nothing could observe it
+            pending = {}
+            for instr in list(block.instrs):
+                if(instr.op == Op.SETGLOBAL):
+                    if(instr.value in pending):
+                        block.instrs.remove(pending[instr.value])
+
+                    # setting another global can raise an error
+                    pending = {instr.value: instr}
+                elif(not instr.pure()):
+                    pending = {}
+
+        # remove unused values, which can make their operands unused
+        users = {instr: 0 for instr in self.function.instrs()}
+        for instr in self.function.instrs():
+            for arg in instr.args:
+                users[arg] += 1
+
+        work = [instr for instr, count in users.items() if count == 0 and instr.pure()]
+        while(work):
+            instr = work.pop()
+            instr.block.instrs.remove(instr)
+            for arg in instr.args:
+                users[arg] -= 1
+                if(users[arg] == 0 and arg.pure()):
+                    work.append(arg)
@@ -74,7 +74,7 @@ class Lexer(object):
 
     def addToken(self, kind, value = None):
         """add a new token, with the specified kind and optionally a value"""
-        self.tokens.append(Token(kind, self.line, value))
+        self.tokens.append(Token(kind, self.line, value, self.start, self.index))
 
     def lexTokens(self):
         """lex all the tokens and return the token list"""
@@ -86,6 +86,7 @@ class Lexer(object):
             self.lexToken()
         
         # always add a end of file token in the end
+        self.start = self.index
         self.addToken(Kind.EOF)
         return self.tokens
 
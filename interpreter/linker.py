@@ -0,0 +1,129 @@
+import hashlib
+import json
+import zlib
+from .lexer import Lexer
+from .parser import Parser
+from .loader import FileLoader, LoadFinder
+from .encoding import Encoder, Decoder
+from .error import ArtifactError
+
+class Linker(object):
+    """this class bundles a program and all files it loads with a constant
+    string into one artifact"""
+
+    def __init__(self):
+        self.sources = {}
+        self.modules = {}
+
+    def link(self, name):
+        """parse the program and its loads, returns the artifact"""
+        root = self.parse(name)
+
+        # resolve the constant loads transitively
+        pending = LoadFinder(root).find()
+        while(pending):
+            module = pending.pop()
+            if(module in self.modules):
+                continue
+            try:
+                self.modules[module] = self.parse(module)
+            except FileNotFoundError:
+                # the load fails at runtime, just like without linking
+                continue
+            pending.extend(LoadFinder(self.modules[module]).find())
+        return Artifact(name, root, self.modules, self.sources)
+
+    def parse(self, name):
+        """read, hash and parse a single file"""
+        with open(name) as f:
+            code = f.read()
+        self.sources[name] = hashlib.sha256(code.encode()).hexdigest()
+
+        l = Lexer(code)
+        p = Parser(l.lexTokens())
+        return p.parse()
+
+
+class Artifact(object):
+    """this class is a linked program, it contains the asts of the program
+    and of its loaded files
+
+    the file format is a magic line, a json header line with the hashes of
+    the sources and the compressed json of the encoded asts. reading an
+    artifact only builds ast nodes, it never runs code from the file"""
+
+    # the first line of every artifact
+    magic = b"CCPA3\n"
+
+    def __init__(self, name, root, modules, sources):
+        self.name = name
+        self.root = root
+        self.modules = modules
+        self.sources = sources
+
+    def write(self, path):
+        """write the artifact to a file"""
+        header = {"main": self.name, "sources": self.sources}
+        with open(path, "wb") as f:
+            f.write(self.magic)
+            f.write(json.dumps(header).encode() + b"\n")
+            modules = {name: Encoder(ast).encode() for name, ast in self.modules.items()}
+            data = {"root": Encoder(self.root).encode(), "modules": modules}
+            f.write(zlib.compress(json.dumps(data).encode()))
+
+    @classmethod
+    def isArtifact(cls, path):
+        """check if the file is an artifact"""
+        with open(path, "rb") as f:
+            return f.read(len(cls.magic)) == cls.magic
+
+    @classmethod
+    def read(cls, path):
+        """read an artifact from a file"""
+        with open(path, "rb") as f:
+            if(f.readline() != cls.magic):
+                raise ArtifactError(path)
+            try:
+                header = json.loads(f.readline())
+                data = json.loads(zlib.decompress(f.read()))
+                root = Decoder(data["root"]).decode()
+                modules = {name: Decoder(ast).decode() for name, ast in data["modules"].items()}
+                return cls(header["main"], root, modules, header["sources"])
+            except (ValueError, KeyError, TypeError, AttributeError, zlib.error):
+                # the file is damaged or was not written by the linker
+                raise ArtifactError(path)
+
+    def stale(self):
+        """return the names of the sources that changed since linking, an
+        artifact is usually run without its sources so missing ones are fine"""
+        names = []
+        for name, digest in self.sources.items():
+            try:
+                with open(name) as f:
+                    if(hashlib.sha256(f.read().encode()).hexdigest() == digest):
+                        continue
+            except FileNotFoundError:
+                continue
+            names.append(name)
+        return names
+
+    def loader(self):
+        """return a loader which takes the files from the artifact"""
+        return LinkedLoader(self.modules)
+
+
+class LinkedLoader(FileLoader):
+    """this class loads the files of an artifact without parsing them,
+    files which could not be linked are parsed like by the FileLoader
+
+    the checker and optimizer change a loaded ast, so the modules are kept
+    encoded and every load gets its own ast"""
+
+    def __init__(self, modules):
+        self.modules = {name: Encoder(ast).encode() for name, ast in modules.items()}
+
+    def load(self, name):
+        """return the ast of a file, preferring the linked one"""
+        if(name in self.modules):
+            return Decoder(self.modules[name]).decode()
+        return FileLoader.load(self, name)
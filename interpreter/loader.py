@@ -0,0 +1,177 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from threading import RLock
+from .token import Kind, Token
+from .lexer import Lexer
+from .parser import Parser
+from .ast import *
+from .encoding import Encoder, Decoder
+
+class FileLoader(object):
+    """this class reads, lexes and parses the files used by load"""
+
+    # the class lexing the files, the ParallelLexer for large files
+    lexer = Lexer
+
+    # parse the scopes when they run, optionally checking their syntax
+    lazy = False
+    strict = False
+
+    def load(self, name):
+        """return the ast of a file, raises FileNotFoundError if it is missing"""
+        with open(name) as f:
+            l = self.lexer(f.read())
+            p = Parser(l.lexTokens(), self.lazy, self.strict)
+            return p.parse()
+
+    def prefetch(self, ast):
+        """prepare the files loaded by the ast, returns the ast"""
+        return ast
+
+    def close(self):
+        """stop preparing files"""
+        pass
+
+
+class Prefetcher(FileLoader):
+    """this class parses the files of constant loads ahead of time
+
+    the files are lexed and parsed on a process pool, which is started by
+    the first prefetch. the workers send back the encoded ast and the names
+    of its constant loads, which are prefetched as soon as the file is
+    parsed. every prefetched file is used by a single load, so a file
+    loaded again is read again like with the FileLoader"""
+
+    def __init__(self, workers = 4):
+        self.workers = workers
+        self.pool = None
+        self.closed = False
+
+        # a finished parse submits its loads while the lock is held
+        self.lock = RLock()
+
+        # the pending parses, by file name
+        self.files = {}
+
+    def prefetch(self, ast):
+        """start parsing the files of all constant loads in the ast"""
+        self.submit(LoadFinder(ast).find())
+        return ast
+
+    def submit(self, names):
+        """start parsing the files that are not pending yet"""
+        with self.lock:
+            for name in names:
+                if(self.closed or name in self.files):
+                    continue
+                future = self.parse(name)
+                if(future):
+                    self.files[name] = future
+                    future.add_done_callback(self.parsed)
+
+    def parsed(self, future):
+        """prefetch the loads of a parsed file, this runs on a thread of the
+        pool or at once if the parse is already done"""
+        if(not future.cancelled() and future.exception() is None):
+            self.submit(future.result()[1])
+
+    def parse(self, name):
+        """start parsing a file on the pool, returns the future or None if
+        the file does not need to be parsed"""
+        if(self.pool is None):
+            # forked workers could inherit locks held by other threads
+            context = multiprocessing.get_context("forkserver")
+            self.pool = ProcessPoolExecutor(self.workers, mp_context = context)
+        return self.pool.submit(parseFile, name, self.lexer, self.lazy, self.strict)
+
+    def load(self, name):
+        """return the ast of a file, waiting for a pending parse"""
+        with self.lock:
+            future = self.files.pop(name, None)
+
+        # the file was not prefetched, parse it now
+        if(future is None):
+            return self.prefetch(FileLoader.load(self, name))
+
+        # this raises the errors of the parse, like loading it now would
+        data, names = future.result()
+        return Decoder(data).decode()
+
+    def close(self):
+        """stop the process pool"""
+        with self.lock:
+            self.closed = True
+        if(self.pool):
+            self.pool.shutdown(wait = False, cancel_futures = True)
+
+
+def parseFile(name, lexer, lazy, strict):
+    """parse a file on a worker, returning the encoded ast and the names of
+    its constant loads"""
+    loader = FileLoader()
+    loader.lexer = lexer
+    loader.lazy = lazy
+    loader.strict = strict
+    ast = loader.load(name)
+    return Encoder(ast).encode(), LoadFinder(ast).find()
+
+
+class LoadFinder(object):
+    """this class finds the file names of all loads with a constant string
+
+    this class uses a visitor pattern to access the ast"""
+
+    def __init__(self, ast):
+        self.ast = ast
+        self.names = []
+
+    def find(self):
+        """return the file names in the order of the loads"""
+        self.ast.visit(self)
+        return self.names
+
+    def visitScope(self, scope):
+        """visit a scope node, lazy scopes are prefetched when they run"""
+        for stmt in scope.stmts:
+            stmt.visit(self)
+
+    def visitIf(self, ifa):
+        """visit a if node"""
+        ifa.scope.visit(self)
+
+    def visitWhile(self, whilea):
+        """visit a while node"""
+        whilea.scope.visit(self)
+
+    def visitLoad(self, load):
+        """visit a load node"""
+        if(isinstance(load.expr, Literal) and load.expr.value.kind == Kind.STRING):
+            self.names.append(load.expr.value.value)
+
+    def visitPrint(self, p):
+        """visit a print node, it contains no loads"""
+        pass
+
+    def visitExec(self, exe):
+        """visit a exec node, it contains no loads"""
+        pass
+
+    def visitAssign(self, assign):
+        """visit an assign node, it contains no loads"""
+        pass
+
+    def visitDeclaration(self, decl):
+        """visit a declaration node, it contains no loads"""
+        pass
+
+    def visitBinary(self, binary):
+        """visit a binary expression, it contains no loads"""
+        pass
+
+    def visitUnary(self, unary):
+        """visit a unary expression, it contains no loads"""
+        pass
+
+    def visitLiteral(self, literal):
+        """visit a literal node, it contains no loads"""
+        pass
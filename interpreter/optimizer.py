@@ -0,0 +1,350 @@
+from itertools import count
+from .ast import *
+from .token import Kind, Token
+from .typecheck import Type
+
+class Optimizer(object):
+    """this class optimizes a type checked ast
+
+    expressions in a loop that only read variables not written by the loop
+    are computed once before the loop, and expressions that are repeated
+    in a block of simple statements are computed once for the block.
+    only expressions that can not raise an error are moved, so the
+    behaviour of the program does not change. a loop may not run at all,
+    so only cheap expressions are moved out of it.
+    this class uses a visitor pattern to access the ast"""
+
+    # the numbers of the temporary variables, shared by all optimizers
+    temps = count()
+
+    def __init__(self, ast):
+        self.ast = ast
+
+    def optimize(self):
+        """optimize the ast, returning the new ast"""
+        return self.ast.visit(self)
+
+    def temp(self, expr):
+        """return a new temporary variable for expr and its declaration,
+        the name can not be written in the code"""
+        token = Token(Kind.IDENT, 0, "$t%d" % next(self.temps))
+        literal = Literal(token)
+        literal.type = expr.type
+        return literal, Declaration(token, expr)
+
+    def safe(self, expr):
+        """check if evaluating the expression can not raise an error"""
+        if(expr.type in (None, Type.UNKNOWN)):
+            return False
+        elif(isinstance(expr, Binary)):
+            return self.safe(expr.left) and self.safe(expr.right)
+        elif(isinstance(expr, Unary)):
+            return self.safe(expr.expr)
+        return True
+
+    def cheap(self, expr):
+        """check if the cost of the expression does not depend on the values,
+        repeating a string can take any amount of time and memory"""
+        if(isinstance(expr, Binary)):
+            if(expr.operator.kind == Kind.MULT and expr.type == Type.STR):
+                return False
+            return self.cheap(expr.left) and self.cheap(expr.right)
+        elif(isinstance(expr, Unary)):
+            return self.cheap(expr.expr)
+        return True
+
+    def key(self, expr):
+        """return a key that is equal for equal expressions"""
+        if(isinstance(expr, Binary)):
+            return (expr.operator.kind, self.key(expr.left), self.key(expr.right))
+        elif(isinstance(expr, Unary)):
+            return (expr.operator.kind, self.key(expr.expr))
+        return (expr.value.kind, expr.value.value)
+
+    def reads(self, expr, names):
+        """add the names of the variables read by the expression"""
+        if(isinstance(expr, Binary)):
+            self.reads(expr.left, names)
+            self.reads(expr.right, names)
+        elif(isinstance(expr, Unary)):
+            self.reads(expr.expr, names)
+        elif(expr.value.kind == Kind.IDENT):
+            names.add(expr.value.value)
+        return names
+
+    def visitScope(self, scope):
+        """visit a scope node"""
+
+        # lazy scopes are optimized when they run for the first time
+        if(scope.tokens is not None):
+            return scope
+
+        scope.stmts = [stmt.visit(self) for stmt in scope.stmts]
+        self.eliminate(scope)
+        scope.update()
+        return scope
+
+    def visitIf(self, ifa):
+        """visit a if node"""
+        ifa.scope = ifa.scope.visit(self)
+        return ifa
+
+    def visitWhile(self, whilea):
+        """visit a while node"""
+
+        # optimize inner loops first
+        whilea.scope = whilea.scope.visit(self)
+
+        # exec, load and lazy scopes can write any variable
+        loop = LoopFinder(whilea).find()
+        if(loop.dynamic):
+            return whilea
+
+        # find the invariant expressions, equal ones share a variable
+        temps = {}
+        decls = []
+        for owner, attr in loop.slots:
+            self.hoist(owner, attr, loop.written, temps, decls)
+        if(not decls):
+            return whilea
+
+        # compute them in a new scope before the loop
+        scope = Scope()
+        for decl in decls:
+            scope.add(decl)
+        scope.add(whilea)
+        return scope
+
+    def hoist(self, owner, attr, written, temps, decls):
+        """replace the largest invariant expressions below owner.attr"""
+        expr = getattr(owner, attr)
+        if(not isinstance(expr, (Binary, Unary))):
+            return
+
+        if(self.safe(expr) and self.cheap(expr) and not self.reads(expr, set()) & written):
+            key = self.key(expr)
+            if(key not in temps):
+                temps[key], decl = self.temp(expr)
+                decls.append(decl)
+            setattr(owner, attr, temps[key])
+        elif(isinstance(expr, Binary)):
+            self.hoist(expr, "left", written, temps, decls)
+            self.hoist(expr, "right", written, temps, decls)
+        else:
+            self.hoist(expr, "expr", written, temps, decls)
+
+    def eliminate(self, scope):
+        """compute repeated expressions of a block only once"""
+
+        # the expressions seen in the current block, and all of them
+        live = Block()
+        groups = []
+        for index, stmt in enumerate(scope.stmts):
+            if(not isinstance(stmt, (Declaration, Assign, Print))):
+                # control flow, load and exec end the block
+                live = Block()
+                continue
+
+            # the declared variable exists before the expression is computed
+            if(isinstance(stmt, Declaration)):
+                live.kill(stmt.name.value)
+            if(stmt.expr):
+                self.collect(stmt, "expr", index, live, groups)
+            if(isinstance(stmt, Assign)):
+                live.kill(stmt.name.value)
+
+        # declare a variable before the first use of every repeated expression
+        decls = {}
+        for group in groups:
+            if(len(group.uses) < 2):
+                continue
+            literal, decl = self.temp(group.expr)
+            decls.setdefault(group.index, []).append(decl)
+            for owner, attr in group.uses:
+                setattr(owner, attr, literal)
+
+        if(decls):
+            stmts = []
+            for index, stmt in enumerate(scope.stmts):
+                stmts.extend(decls.get(index, []))
+                stmts.append(stmt)
+            scope.stmts = stmts
+
+    def collect(self, owner, attr, index, live, groups):
+        """find the safe expressions below owner.attr, the inner ones first"""
+        expr = getattr(owner, attr)
+        if(not isinstance(expr, (Binary, Unary))):
+            return
+
+        safe = self.safe(expr)
+        key = self.key(expr) if safe else None
+        if(key in live.groups):
+            # the inner expressions are replaced together with this one
+            live.groups[key].uses.append((owner, attr))
+            return
+
+        if(isinstance(expr, Binary)):
+            self.collect(expr, "left", index, live, groups)
+            self.collect(expr, "right", index, live, groups)
+        else:
+            self.collect(expr, "expr", index, live, groups)
+
+        if(safe):
+            group = Group(expr, index, self.reads(expr, set()))
+            group.uses.append((owner, attr))
+            live.add(key, group)
+            groups.append(group)
+
+    def visitPrint(self, p):
+        """visit a print node"""
+        return p
+
+    def visitLoad(self, load):
+        """visit a load node"""
+        return load
+
+    def visitExec(self, exe):
+        """visit a exec node"""
+        return exe
+
+    def visitAssign(self, assign):
+        """visit an assign node"""
+        return assign
+
+    def visitDeclaration(self, decl):
+        """visit a declaration node"""
+        return decl
+
+    def visitBinary(self, binary):
+        """visit a binary expression"""
+        return binary
+
+    def visitUnary(self, unary):
+        """visit a unary expression"""
+        return unary
+
+    def visitLiteral(self, literal):
+        """visit a literal node"""
+        return literal
+
+
+class Group(object):
+    """this class contains the uses of an expression in a block"""
+
+    def __init__(self, expr, index, names):
+        self.expr = expr
+        self.index = index
+        self.names = names
+        self.uses = []
+
+
+class Block(object):
+    """this class contains the expressions seen in a block of simple
+    statements, by key and by the variables they read"""
+
+    def __init__(self):
+        self.groups = {}
+        self.readers = {}
+
+    def add(self, key, group):
+        """add the group of an expression"""
+        self.groups[key] = group
+        for name in group.names:
+            self.readers.setdefault(name, set()).add(key)
+
+    def kill(self, name):
+        """forget the expressions reading a written variable"""
+        for key in self.readers.pop(name, ()):
+            # the key may already be killed by another variable
+            self.groups.pop(key, None)
+
+
+class LoopFinder(object):
+    """this class finds the expressions and written variables of a loop
+
+    only the expressions computed in every iteration are collected, the
+    ones in the scopes of ifs and inner loops may never be computed.
+    this class uses a visitor pattern to access the ast"""
+
+    def __init__(self, whilea):
+        self.whilea = whilea
+
+        # the attributes holding expressions, as (node, attribute)
+        self.slots = []
+        self.written = set()
+        self.dynamic = False
+
+        # the number of ifs and loops around the current statement
+        self.depth = 0
+
+    def find(self):
+        """visit the loop, returning self"""
+        self.slots.append((self.whilea, "condition"))
+        self.whilea.scope.visit(self)
+        return self
+
+    def visitScope(self, scope):
+        """visit a scope node"""
+
+        # the statements of a lazy scope are not known yet
+        if(scope.tokens is not None):
+            self.dynamic = True
+
+        for stmt in scope.stmts:
+            stmt.visit(self)
+
+    def visitIf(self, ifa):
+        """visit a if node"""
+        self.slot(ifa, "condition")
+        self.branch(ifa.scope)
+
+    def visitWhile(self, whilea):
+        """visit a while node"""
+        self.slot(whilea, "condition")
+        self.branch(whilea.scope)
+
+    def branch(self, scope):
+        """visit a scope that may not run"""
+        self.depth += 1
+        scope.visit(self)
+        self.depth -= 1
+
+    def slot(self, owner, attr):
+        """add an expression if it is computed in every iteration"""
+        if(not self.depth):
+            self.slots.append((owner, attr))
+
+    def visitPrint(self, p):
+        """visit a print node"""
+        self.slot(p, "expr")
+
+    def visitLoad(self, load):
+        """visit a load node"""
+        self.dynamic = True
+
+    def visitExec(self, exe):
+        """visit a exec node"""
+        self.dynamic = True
+
+    def visitAssign(self, assign):
+        """visit an assign node"""
+        self.written.add(assign.name.value)
+        self.slot(assign, "expr")
+
+    def visitDeclaration(self, decl):
+        """visit a declaration node"""
+        self.written.add(decl.name.value)
+        if(decl.expr):
+            self.slot(decl, "expr")
+
+    def visitBinary(self, binary):
+        """visit a binary expression, its value is not used"""
+        pass
+
+    def visitUnary(self, unary):
+        """visit a unary expression, its value is not used"""
+        pass
+
+    def visitLiteral(self, literal):
+        """visit a literal node, its value is not used"""
+        pass
@@ -0,0 +1,83 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from .token import Kind, Token
+from .lexer import Lexer
+
+class ParallelLexer(object):
+    """This class converts a large string to tokens on a process pool
+
+    the code is split into chunks after newlines that are not in a string.
+    strings have no escapes, so a newline is in a string exactly when an
+    odd number of quotes is before it. the tokens are the same as the
+    ones of the Lexer"""
+
+    def __init__(self, code, workers = None, size = 1 << 20):
+        self.code = code
+        self.workers = workers or os.cpu_count()
+
+        # the number of characters per chunk
+        self.size = size
+
+    def split(self):
+        """return the start of every chunk"""
+        starts = [0]
+
+        # the number of quotes before position
+        quotes = 0
+        position = 0
+        while(starts[-1] + self.size < len(self.code)):
+            index = self.code.find("\n", starts[-1] + self.size)
+            while(index >= 0):
+                quotes += self.code.count("\"", position, index)
+                position = index
+                if(quotes % 2 == 0):
+                    break
+
+                # the newline is in a string, continue after its closing quote
+                position = self.code.find("\"", index) + 1
+                quotes += 1
+                index = self.code.find("\n", position)
+
+            if(index < 0):
+                break
+            starts.append(index + 1)
+        return starts
+
+    def lexTokens(self):
+        """lex all the tokens and return the token list"""
+        # an unterminated string is lexed like before, with its error
+        if(self.code.count("\"") % 2 == 1):
+            return Lexer(self.code).lexTokens()
+
+        starts = self.split()
+        if(len(starts) == 1):
+            return Lexer(self.code).lexTokens()
+
+        ends = starts[1:] + [len(self.code)]
+        chunks = [self.code[start : end] for start, end in zip(starts, ends)]
+        tokens = []
+        line = 0
+
+        # forked workers could inherit the locks held by other threads,
+        # like the one of the symbol table
+        context = multiprocessing.get_context("forkserver")
+        with ProcessPoolExecutor(min(self.workers, len(chunks)), mp_context = context) as pool:
+            # the lines of a chunk start after the lines of the ones before
+            for lexed, lines in pool.map(lexChunk, chunks, starts):
+                tokens.extend(Token(kind, line + relative, value, start, end)
+                              for kind, relative, value, start, end in lexed)
+                line += lines
+
+        # always add a end of file token in the end
+        tokens.append(Token(Kind.EOF, line, None, len(self.code), len(self.code)))
+        return tokens
+
+
+def lexChunk(code, offset):
+    """lex a chunk starting at offset on a worker, returning the tokens as
+    tuples without the end of file token and the number of lines"""
+    lexer = Lexer(code)
+    tokens = lexer.lexTokens()[:-1]
+    return [(token.kind, token.line, token.value, token.start + offset, token.end + offset)
+            for token in tokens], lexer.line
@@ -3,12 +3,19 @@ from .ast import *
 from .error import ParseError
 
 class Parser(object):
-    """this class parses a list of tokens into an ast"""
+    """this class parses a list of tokens into an ast
 
-    def __init__(self, tokens):
+    in lazy mode the statements of scopes are only parsed by expand, when
+    the scope is run for the first time. in strict mode the syntax of the
+    lazy scopes is still checked while parsing"""
+
+    def __init__(self, tokens, lazy = False, strict = False):
         self.tokens = tokens
         self.index = 0
 
+        self.lazy = lazy
+        self.strict = strict
+
     def peek(self):
         """return the current token"""
         return self.tokens[self.index]
@@ -65,25 +72,32 @@ class Parser(object):
 
         statement = let | scope | if | while | print | load | exec | expressionstmt"""
 
+        # remember the first token of the statement
+        start = self.index
+
         # peek the kind in order to determine which type it is
         kind = self.peek().kind
         if(kind == Kind.LET):
-            return self.parseLet()
+            stmt = self.parseLet()
         elif(kind == Kind.LCURLY):
-            return self.parseScope()
+            stmt = self.parseScope()
         elif(kind == Kind.IF):
-            return self.parseIf()
+            stmt = self.parseIf()
         elif(kind == Kind.WHILE):
-            return self.parseWhile()
+            stmt = self.parseWhile()
         elif(kind == Kind.PRINT):
-            return self.parsePrint()
+            stmt = self.parsePrint()
         elif(kind == Kind.LOAD):
-            return self.parseLoad()
+            stmt = self.parseLoad()
         elif(kind == Kind.EXEC):
-            return self.parseExec()
+            stmt = self.parseExec()
         else:
-            return self.parseExpressionStmt()
-        
+            stmt = self.parseExpressionStmt()
+
+        # store the token range of the statement
+        stmt.span = (start, self.index)
+        return stmt
+
     def parseLet(self):
         """parse a single let statement
 
@@ -108,6 +122,13 @@ class Parser(object):
         scope = LCURLY statement* RCURLY"""
 
         ast = Scope()
+        if(self.lazy):
+            return self.skipScope(ast)
+        return self.parseBody(ast)
+
+    def parseBody(self, ast):
+        """parse the statements of a scope into ast"""
+        start = self.index
 
         # they start with a lcurly
         self.consume(Kind.LCURLY)
@@ -118,6 +139,46 @@ class Parser(object):
 
         # consume the closing bracket
         self.consume(Kind.RCURLY)
+        ast.span = (start, self.index)
+        return ast
+
+    def skipScope(self, ast):
+        """find the closing bracket of a scope without parsing it"""
+        start = self.index
+        self.consume(Kind.LCURLY)
+
+        # match the brackets until the closing one
+        depth = 1
+        while(depth > 0):
+            # a scope that is not closed is a syntax error
+            if(not self.has()):
+                raise ParseError
+
+            kind = self.next().kind
+            if(kind == Kind.LCURLY):
+                depth += 1
+            elif(kind == Kind.RCURLY):
+                depth -= 1
+
+        if(self.strict):
+            # report syntax errors now, without keeping the statements
+            checker = Parser(self.tokens)
+            checker.index = start
+            checker.parseScope()
+
+        ast.span = (start, self.index)
+        ast.tokens = self.tokens
+        return ast
+
+    def expand(self, ast):
+        """parse the statements of a lazy scope, returns the scope"""
+        self.index = ast.span[0]
+
+        # a syntax error leaves the scope lazy, running it fails again
+        parsed = self.parseBody(Scope())
+        ast.stmts = parsed.stmts
+        ast.declares = parsed.declares
+        ast.tokens = None
         return ast
 
     def parseIf(self):
@@ -0,0 +1,28 @@
+import os
+import stat
+import tempfile
+
+def private(path):
+    """create a directory only the user can access and return its path,
+    raises a PermissionError if it belongs to someone else or others can
+    access it"""
+    os.makedirs(path, 0o700, exist_ok = True)
+
+    # a directory created by someone else before us can not be trusted
+    info = os.lstat(path)
+    if(not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077):
+        raise PermissionError("%s is not a private directory" % (path))
+    return path
+
+def cache(name):
+    """return the private cache directory of name"""
+    root = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return private(os.path.join(root, name))
+
+def runtime(name):
+    """return the private directory of name for sockets, the shared temp
+    directory gets a directory per user"""
+    root = os.environ.get("XDG_RUNTIME_DIR")
+    if(root):
+        return private(os.path.join(root, name))
+    return private(os.path.join(tempfile.gettempdir(), "%s-%d" % (name, os.getuid())))
@@ -0,0 +1,34 @@
+from threading import Lock
+
+class SymbolTable(object):
+    """This class interns identifiers, giving each name a small integer id
+
+    there is a single table for the process, so the names of loaded and
+    executed code get the same ids as the ones of the program"""
+
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+
+        # the table can be used by several threads
+        self.lock = Lock()
+
+    def intern(self, name):
+        """return the id of a name, adding it if it is new"""
+        symbol = self.ids.get(name)
+        if(symbol is not None):
+            return symbol
+
+        with self.lock:
+            if(name not in self.ids):
+                self.ids[name] = len(self.names)
+                self.names.append(name)
+            return self.ids[name]
+
+    def name(self, symbol):
+        """return the interned name of an id"""
+        return self.names[symbol]
+
+
+# the symbol table shared by the lexer, parser and environment
+symbols = SymbolTable()
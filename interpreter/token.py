@@ -1,4 +1,5 @@
 from enum import Enum
+from .symbol import symbols
 
 class Kind(Enum):
     """This enum describes the different token kinds"""
@@ -41,13 +42,39 @@ class Kind(Enum):
 
 
 class Token(object):
-    """This class contains the data about a single token"""
+    """This class contains the data about a single token
 
-    def __init__(self, kind, line = 0, value=None):
+    identifiers are interned, their value is the shared name and symbol
+    is its id in the symbol table"""
+
+    # there are a lot of tokens, they do not need a dict
+    __slots__ = ("kind", "value", "line", "start", "end", "symbol")
+
+    def __init__(self, kind, line = 0, value=None, start = 0, end = 0):
         self.kind = kind
         self.value = value
         self.line = line
 
+        # the code range of the lexeme
+        self.start = start
+        self.end = end
+        self.intern()
+
+    def intern(self):
+        """set the symbol of an identifier"""
+        self.symbol = None
+        if(self.kind == Kind.IDENT):
+            self.symbol = symbols.intern(self.value)
+            self.value = symbols.name(self.symbol)
+
+    def __getstate__(self):
+        # the ids are only valid in this process
+        return (self.kind, self.value, self.line, self.start, self.end)
+
+    def __setstate__(self, state):
+        self.kind, self.value, self.line, self.start, self.end = state
+        self.intern()
+
     def __repr__(self):
         if(self.value):
             return "Token{%s, %s}" % (self.kind, self.value)
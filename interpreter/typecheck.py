@@ -0,0 +1,318 @@
+from enum import Enum
+from .ast import *
+from .token import Kind, Token
+from .error import TypeMismatchError
+
+class Type(Enum):
+    """This enum describes the static types of values"""
+
+    INT = 1
+    STR = 2
+    BOOL = 3
+    UNKNOWN = 4
+
+class Mode(Enum):
+    """This enum describes the operand types of a binary expression"""
+
+    INTINT = 1
+    STRSTR = 2
+    STRINT = 3
+    INTSTR = 4
+    UNKNOWN = 5
+
+
+class TypeChecker(object):
+    """this class infers the types of an ast before it is interpreted
+
+    the inference is flow sensitive, every binary node is annotated with
+    the mode of its operands and type errors are raised before execution.
+    this class uses a visitor pattern to access the ast"""
+
+    # types which behave like numbers
+    numeric = (Type.INT, Type.BOOL)
+
+    # operators that always return a bool
+    equality = (Kind.CMPEQ, Kind.CMPNOTEQ)
+
+    # operators that compare two numbers or two strings
+    comparison = (Kind.CMPLESS, Kind.CMPLESSEQ, Kind.CMPGREATER, Kind.CMPGREATEREQ)
+
+    def __init__(self, ast):
+        self.ast = ast
+
+        # the types of the variables, one dict per frame
+        self.stack = [{}]
+
+        # frames in which exec or load could have declared variables
+        self.dynamic = [False]
+
+        # the changed variables as (frame, name, old type), while in a branch
+        self.log = []
+        self.branches = 0
+
+        # the number of loops whose types may still change, errors are only
+        # raised once the types of all loops are final
+        self.pending = 0
+
+    def check(self):
+        """check the ast, raising an error on the first type error"""
+        self.ast.visit(self)
+        return self.ast
+
+    def push(self):
+        """push a new type frame"""
+        self.stack.append({})
+        self.dynamic.append(False)
+
+    def pop(self):
+        """pop a type frame"""
+        self.stack.pop()
+
+        # variables declared by exec or load may have been assigned
+        # instead of the outer ones, so nothing is known about them
+        if(self.dynamic.pop()):
+            self.forget()
+
+    def forget(self):
+        """forget the types of all variables"""
+        for index, frame in enumerate(self.stack):
+            for name in frame:
+                self.write(index, name, Type.UNKNOWN)
+
+    def write(self, index, name, kind):
+        """set the type of a variable in a frame, logging the old one"""
+        frame = self.stack[index]
+        if(self.branches):
+            self.log.append((index, name, frame.get(name)))
+        frame[name] = kind
+
+    def getType(self, name):
+        """get the type, searching all frames"""
+        for frame in reversed(self.stack):
+            if(name in frame):
+                return frame[name]
+        return Type.UNKNOWN
+
+    def setType(self, name, kind):
+        """set the type, searching all frames"""
+        for index in range(len(self.stack) - 1, -1, -1):
+            if(name in self.stack[index]):
+                self.write(index, name, kind)
+                return
+
+        # the variable lives in an environment we do not know
+        self.write(0, name, kind)
+
+    def initType(self, name, kind):
+        """init the type of a variable in the current frame"""
+        self.write(len(self.stack) - 1, name, kind)
+
+    def branch(self):
+        """start a branch that may or may not run, returns its mark"""
+        self.branches += 1
+        return (len(self.log), len(self.stack))
+
+    def merge(self, mark):
+        """merge the state at the mark with the current one, variables with
+        different types become unknown. returns True if a type changed
+
+        only the variables written since the mark are compared, the frames
+        pushed by the branch are already gone"""
+        start, depth = mark
+        changed = False
+        seen = set()
+        for index, name, old in self.log[start:]:
+            if(index >= depth or (index, name) in seen):
+                continue
+            seen.add((index, name))
+
+            # the outer branches still see the first old type in the log
+            frame = self.stack[index]
+            if(frame.get(name) != old):
+                frame[name] = Type.UNKNOWN
+                changed = changed or old != Type.UNKNOWN
+
+        self.branches -= 1
+        if(not self.branches):
+            self.log = []
+        return changed
+
+    def visitScope(self, scope):
+        """visit a scope node"""
+
+        # a lazy scope can change any variable, it is checked when it runs
+        if(scope.tokens is not None):
+            self.forget()
+            return None
+
+        self.push()
+        for stmt in scope.stmts:
+            stmt.visit(self)
+        self.pop()
+        return None
+
+    def visitIf(self, ifa):
+        """visit a if node"""
+        ifa.condition.visit(self)
+
+        # the scope may or may not be executed
+        mark = self.branch()
+        ifa.scope.visit(self)
+        self.merge(mark)
+        return None
+
+    def visitWhile(self, whilea):
+        """visit a while node"""
+
+        # repeat until the types at the start of the loop do not change,
+        # the types of the first passes may be too narrow to report errors
+        self.pending += 1
+        while(True):
+            mark = self.branch()
+            whilea.condition.visit(self)
+            whilea.scope.visit(self)
+            if(not self.merge(mark)):
+                break
+        self.pending -= 1
+
+        # check the loop again with the final types, this annotates the nodes
+        mark = self.branch()
+        whilea.condition.visit(self)
+        whilea.scope.visit(self)
+        self.merge(mark)
+        return None
+
+    def mismatch(self, operator, *types):
+        """raise a type error, or return unknown while a loop is pending"""
+        if(self.pending):
+            return Type.UNKNOWN
+        raise TypeMismatchError(operator, *types)
+
+    def visitPrint(self, p):
+        """visit a print node"""
+        p.expr.visit(self)
+        return None
+
+    def visitLoad(self, load):
+        """visit a load node"""
+        load.expr.visit(self)
+
+        # the loaded code can change any variable
+        self.forget()
+        self.dynamic[-1] = True
+        return None
+
+    def visitExec(self, exe):
+        """visit a exec node"""
+        exe.expr.visit(self)
+
+        # the executed code can change any variable
+        self.forget()
+        self.dynamic[-1] = True
+        return None
+
+    def visitAssign(self, assign):
+        """visit an assign node"""
+        self.setType(assign.name.value, assign.expr.visit(self))
+        return None
+
+    def visitDeclaration(self, decl):
+        """visit a declaration node"""
+
+        # the variable is declared before the expression is evaluated
+        self.initType(decl.name.value, Type.UNKNOWN)
+        if(decl.expr):
+            self.setType(decl.name.value, decl.expr.visit(self))
+        return None
+
+    def visitBinary(self, binary):
+        """visit a binary expression, returning its type"""
+        left = binary.left.visit(self)
+        right = binary.right.visit(self)
+
+        # annotate the binary with the mode of its operands
+        if(left in self.numeric and right in self.numeric):
+            binary.mode = Mode.INTINT
+        elif(left == Type.STR and right == Type.STR):
+            binary.mode = Mode.STRSTR
+        elif(left == Type.STR and right in self.numeric):
+            binary.mode = Mode.STRINT
+        elif(left in self.numeric and right == Type.STR):
+            binary.mode = Mode.INTSTR
+        else:
+            binary.mode = Mode.UNKNOWN
+
+        binary.type = self.binaryType(binary, left, right)
+        return binary.type
+
+    def binaryType(self, binary, left, right):
+        """return the result type of a binary expression"""
+        kind = binary.operator.kind
+        if(kind in self.equality):
+            return Type.BOOL
+
+        # nothing can be checked without knowing both operands
+        if(binary.mode == Mode.UNKNOWN):
+            return Type.BOOL if kind in self.comparison else Type.UNKNOWN
+
+        if(kind == Kind.PLUS):
+            if(binary.mode == Mode.INTINT):
+                return Type.INT
+            # strings can only be concatenated with strings and ints
+            if(Type.BOOL not in (left, right)):
+                return Type.STR
+        elif(kind == Kind.MINUS):
+            if(binary.mode == Mode.INTINT):
+                return Type.INT
+        elif(kind == Kind.MULT):
+            if(binary.mode == Mode.INTINT):
+                return Type.INT
+            # strings can be repeated
+            if(binary.mode != Mode.STRSTR):
+                return Type.STR
+        elif(kind == Kind.DIV):
+            # the division of two ints is a float
+            if(binary.mode == Mode.INTINT):
+                return Type.UNKNOWN
+        elif(kind in self.comparison):
+            if(binary.mode in (Mode.INTINT, Mode.STRSTR)):
+                return Type.BOOL
+
+        return self.mismatch(binary.operator, left, right)
+
+    def visitUnary(self, unary):
+        """visit a unary expression, returning its type"""
+        unary.type = self.unaryType(unary, unary.expr.visit(self))
+        return unary.type
+
+    def unaryType(self, unary, expr):
+        """return the result type of a unary expression"""
+        if(unary.operator.kind == Kind.BANG):
+            return Type.BOOL
+        elif(unary.operator.kind == Kind.PLUS):
+            # the interpreter returns the value unchanged
+            return expr
+        elif(expr in self.numeric):
+            return Type.INT
+        elif(expr == Type.UNKNOWN):
+            return Type.UNKNOWN
+
+        return self.mismatch(unary.operator, expr)
+
+    def visitLiteral(self, literal):
+        """visit a literal node, returning its type"""
+        literal.type = self.literalType(literal)
+        return literal.type
+
+    def literalType(self, literal):
+        """return the type of a literal"""
+        kind = literal.value.kind
+        if(kind == Kind.NUMBER):
+            return Type.INT
+        elif(kind == Kind.STRING):
+            return Type.STR
+        elif(kind in [Kind.TRUE, Kind.FALSE]):
+            return Type.BOOL
+        elif(kind == Kind.IDENT):
+            return self.getType(literal.value.value)
+        return Type.UNKNOWN
@@ -0,0 +1,185 @@
+import io
+import json
+import os
+import signal
+import socket
+import struct
+import sys
+import traceback
+from .loader import FileLoader, Prefetcher
+from . import paths
+
+# the header of a frame, its kind and the length of the data
+header = struct.Struct(">cI")
+
+class Zygote(object):
+    """this class is a server that runs programs in forked workers
+
+    the server has imported the interpreter and parsed the libraries once,
+    every request forks a worker that has them ready. the worker runs the
+    program in the directory of the client and streams the output back in
+    frames, the last frame contains the exit status"""
+
+    def __init__(self, handler, path = None, libraries = ()):
+        # the handler runs a program given the arguments and a loader
+        self.handler = handler
+        self.path = path or self.defaultPath()
+
+        # the parsed libraries, by absolute path with their modification time
+        self.cache = {}
+        for name in libraries:
+            key = os.path.abspath(name)
+            self.cache[key] = (os.stat(key).st_mtime_ns, FileLoader().load(key))
+
+    @staticmethod
+    def defaultPath():
+        """return the default path of the socket, in a directory only the
+        user can access"""
+        return os.path.join(paths.runtime("ccp"), "zygote.sock")
+
+    def serve(self):
+        """accept requests until the server is stopped"""
+        if(os.path.exists(self.path)):
+            os.unlink(self.path)
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.path)
+        server.listen()
+
+        # the workers are not waited for, a terminated server removes the socket
+        signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, self.stop)
+        try:
+            while(True):
+                conn, _ = server.accept()
+                if(os.fork() == 0):
+                    server.close()
+                    self.work(conn)
+                conn.close()
+        finally:
+            server.close()
+            os.unlink(self.path)
+
+    def stop(self, signum, frame):
+        """stop serving on SIGTERM"""
+        sys.exit(0)
+
+    def work(self, conn):
+        """run a single request in the forked worker, this never returns"""
+        status = 1
+        try:
+            # the programs of the worker are waited for again
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+            request = json.loads(conn.makefile("rb").readline())
+            os.chdir(request["cwd"])
+            sys.stdout = self.stream(conn, b"o")
+            sys.stderr = self.stream(conn, b"e")
+            try:
+                status = self.handler(request["args"], CachedLoader(self.cache))
+            except SystemExit as exit:
+                status = self.status(exit.code)
+            except BaseException:
+                traceback.print_exc()
+
+            sys.stdout.flush()
+            sys.stderr.flush()
+            conn.sendall(header.pack(b"x", status))
+        finally:
+            os._exit(status)
+
+    def status(self, code):
+        """return the exit status of a sys.exit(code), like python does"""
+        if(code is None):
+            return 0
+        elif(type(code) == int):
+            return code & 0xff
+
+        # other values are printed
+        print(code, file = sys.stderr)
+        return 1
+
+    def stream(self, conn, kind):
+        """return a text stream writing frames of kind, flushed every line"""
+        return io.TextIOWrapper(io.BufferedWriter(FrameWriter(conn, kind)), line_buffering = True)
+
+
+class FrameWriter(io.RawIOBase):
+    """this class sends everything written as frames of a kind"""
+
+    def __init__(self, conn, kind):
+        self.conn = conn
+        self.kind = kind
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.conn.sendall(header.pack(self.kind, len(data)) + bytes(data))
+        return len(data)
+
+
+class CachedLoader(Prefetcher):
+    """this class serves the libraries parsed by the zygote
+
+    every worker has its own copy of the parsed files, so they can be
+    changed by the checker and optimizer. a library is used by a single
+    load and is parsed again when it changed on disk"""
+
+    def __init__(self, cache, workers = 4):
+        Prefetcher.__init__(self, workers)
+        self.cache = dict(cache)
+
+    def cached(self, name):
+        """return the parsed library of name, or None"""
+        key = os.path.abspath(name)
+        entry = self.cache.pop(key, None)
+        try:
+            if(entry and os.stat(key).st_mtime_ns == entry[0]):
+                return entry[1]
+        except FileNotFoundError:
+            pass
+        return None
+
+    def parse(self, name):
+        """start parsing a file on the pool, unless it is a library"""
+        if(os.path.abspath(name) in self.cache):
+            return None
+        return Prefetcher.parse(self, name)
+
+    def load(self, name):
+        """return the ast of a file, a library or a pending parse"""
+        ast = self.cached(name)
+        if(ast is None):
+            return Prefetcher.load(self, name)
+        return self.prefetch(ast)
+
+
+class Client(object):
+    """this class sends a program to a zygote and writes its output"""
+
+    def __init__(self, path = None):
+        self.path = path or Zygote.defaultPath()
+
+    def run(self, args):
+        """run a program with the arguments of run.py, returns the exit status"""
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conn.connect(self.path)
+        with conn:
+            request = {"cwd": os.getcwd(), "args": args}
+            conn.sendall(json.dumps(request).encode() + b"\n")
+
+            streams = {b"o": sys.stdout.buffer, b"e": sys.stderr.buffer}
+            reader = conn.makefile("rb")
+            while(True):
+                frame = reader.read(header.size)
+                if(len(frame) < header.size):
+                    # the worker died without sending its status
+                    return 1
+
+                kind, length = header.unpack(frame)
+                if(kind == b"x"):
+                    return length
+                streams[kind].write(reader.read(length))
+                streams[kind].flush()
@@ -0,0 +1,20 @@
+import sys
+from interpreter import *
+
+# usage: python link.py program artifact
+if(len(sys.argv) != 3):
+    print("usage: python link.py program artifact")
+    sys.exit(2)
+
+try:
+    # parse the program and all files it loads
+    linker = Linker()
+    artifact = linker.link(sys.argv[1])
+
+    # write them into a single file
+    artifact.write(sys.argv[2])
+    print("linked %d files into %s" % (len(artifact.sources), sys.argv[2]))
+
+except Error as err:
+    print(err)
+    sys.exit(1)
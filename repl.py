@@ -1,31 +1,47 @@
 from interpreter import *
 
-# init the enviroment for the variables
-# so that the single lines all access the same
-env = Environment()
-
-while(True):
-    # read a single line
-    line = input("-> ")
-
-    # lex the line
-    l = Lexer(line)
-    tokens = l.lexTokens()
-
-    # break if the line is empty
-    if(len(tokens) == 1):
-        break
-
-    try:
-        # parse the tokens
-        p = Parser(tokens)
-        ast = p.parse()
-        
-        # interpret the AST
-        i = Interpreter(ast, env)
-        result = i.eval()
-        if(result):
-            print(result)
-
-    except Error as err:
-        print(err)
\ No newline at end of file
+def main():
+    """read, check and run single lines until an empty one"""
+
+    # init the enviroment for the variables
+    # so that the single lines all access the same
+    env = Environment()
+
+    # parse the files of constant loads in the background
+    loader = Prefetcher()
+
+    while(True):
+        # read a single line
+        line = input("-> ")
+
+        # lex the line
+        l = Lexer(line)
+        tokens = l.lexTokens()
+
+        # break if the line is empty
+        if(len(tokens) == 1):
+            break
+
+        try:
+            # parse the tokens
+            p = Parser(tokens)
+            ast = p.parse()
+
+            # check the types before running and optimize
+            ast = Optimizer(TypeChecker(ast).check()).optimize()
+
+            # interpret the AST
+            i = Interpreter(loader.prefetch(ast), env, loader)
+            result = i.eval()
+            if(result):
+                print(result)
+
+        except Error as err:
+            print(err)
+
+    # stop parsing the files that were not loaded
+    loader.close()
+
+# the workers of the prefetcher import this file without running it
+if(__name__ == "__main__"):
+    main()
\ No newline at end of file
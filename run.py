@@ -0,0 +1,76 @@
+import sys
+from interpreter import *
+
+# the command line of the script
+usage = "usage: python run.py [--ir] [--native] [--parallel] [--lazy] [--strict] file [name=value ...]"
+
+def main(argv, loader = None):
+    """run a program, returning the exit status. the zygote passes a loader
+    with the files it parsed ahead of time"""
+    options = [arg for arg in argv if arg.startswith("--")]
+    args = [arg for arg in argv if not arg.startswith("--")]
+    if(len(args) < 1):
+        print(usage)
+        return 2
+
+    # init the enviroment with the variables given on the command line
+    env = Environment()
+    for arg in args[1:]:
+        name, value = arg.split("=", 1)
+        env.initValue(symbols.intern(name))
+        env.setValue(symbols.intern(name), int(value) if value.isdigit() else value)
+
+    loader = loader or Prefetcher()
+    try:
+        if(Artifact.isArtifact(args[0])):
+            # a linked artifact contains the parsed files
+            artifact = Artifact.read(args[0])
+            for name in artifact.stale():
+                # the artifact still runs the code that was linked
+                print("warning: %s changed since it was linked" % (name), file = sys.stderr)
+            loader = artifact.loader()
+            ast = artifact.root
+        else:
+            # parse the file and prefetch its loads
+            if("--parallel" in options):
+                # lex large files on all cores
+                loader.lexer = ParallelLexer
+            if("--lazy" in options):
+                # parse scopes when they run, --strict still checks their syntax
+                loader.lazy = True
+                loader.strict = "--strict" in options
+            ast = loader.load(args[0])
+
+        # check the types, optimize and interpret the AST
+        ast = Optimizer(TypeChecker(ast).check()).optimize()
+        if("--native" in options and CBackend(ast).run(env)):
+            # the compiled program ran without an overflow
+            return 0
+
+        function = None
+        if("--ir" in options):
+            try:
+                # lower to the ssa form and optimize it
+                function = IROptimizer(Lowering(ast).lower()).optimize()
+            except UnsupportedError:
+                # exec and load need the ast interpreter
+                pass
+
+        if(function):
+            IRInterpreter(function, env).eval()
+        else:
+            Interpreter(ast, env, loader).eval()
+
+    except FileNotFoundError:
+        print(FileCouldNotBeLoaded(args[0]))
+        return 1
+    except Error as err:
+        print(err)
+        return 1
+    finally:
+        # stop the workers of the files that were not loaded
+        loader.close()
+    return 0
+
+if(__name__ == "__main__"):
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,70 @@
+import os
+import shutil
+import pytest
+from interpreter import *
+
+# the example program of the repository
+fib = open(os.path.join(os.path.dirname(__file__), "..", "fib")).read()
+
+# small programs covering the edge cases of the generated c code
+programs = [
+    "print +true; print -true; print !0; print +3 - -2; print +(1 < 2);",
+    "let a = 1; { let a = 2; print a; } print a;",
+    "let i = 0; let s = 0; while(i < 5) { let j = 0; while(j < i) { s = s + i * j; j = j + 1; } i = i + 1; } print s;",
+    "let x = 3; if(x > 5) { x = 1; } if(x < 5) { x = x * 2; } print x;",
+    "let b = true; b = !b; print b; print b == false;",
+    "let n = -9223372036854775807; print n - 1;",
+]
+
+pytestmark = pytest.mark.skipif(not shutil.which("cc"), reason = "no c compiler")
+
+def variables(values):
+    """return an environment with the variables of the command line"""
+    env = Environment()
+    for name, value in values.items():
+        env.initValue(symbols.intern(name))
+        env.setValue(symbols.intern(name), value)
+    return env
+
+def prepare(code):
+    """parse, check and optimize a program like run.py"""
+    ast = Parser(Lexer(code).lexTokens()).parse()
+    return Optimizer(TypeChecker(ast).check()).optimize()
+
+def interpret(code, values, capsys):
+    """return the output of the ast interpreter"""
+    Interpreter(prepare(code), variables(values), FileLoader()).eval()
+    return capsys.readouterr().out
+
+def native(code, values, capsys, cache):
+    """return the output of the compiled program, or None if it has to be
+    interpreted"""
+    backend = CBackend(prepare(code))
+    backend.cache = str(cache)
+    if(not backend.run(variables(values))):
+        return None
+    return capsys.readouterr().out
+
+@pytest.mark.parametrize("n", [0, 1, 2, 10, 90])
+def test_fib(n, capsys, tmp_path):
+    assert native(fib, {"fib": n}, capsys, tmp_path) == interpret(fib, {"fib": n}, capsys)
+
+@pytest.mark.parametrize("code", programs)
+def test_programs(code, capsys, tmp_path):
+    assert native(code, {}, capsys, tmp_path) == interpret(code, {}, capsys)
+
+def test_overflow(capsys, tmp_path):
+    # the int64 overflows, so the interpreter has to run it with big ints
+    assert native(fib, {"fib": 100}, capsys, tmp_path) is None
+    assert capsys.readouterr().out == ""
+
+def test_unsupported(capsys, tmp_path):
+    assert native("print \"a\";", {}, capsys, tmp_path) is None
+    assert native("print 7 / 2;", {}, capsys, tmp_path) is None
+
+def test_cache(capsys, tmp_path):
+    native(fib, {"fib": 5}, capsys, tmp_path)
+    native(fib, {"fib": 6}, capsys, tmp_path)
+
+    # the executable is reused and no temporary files are left
+    assert len(os.listdir(tmp_path)) == 1
@@ -0,0 +1,88 @@
+import os
+import random
+import pytest
+from interpreter import *
+
+# the example program of the repository
+fib = open(os.path.join(os.path.dirname(__file__), "..", "fib")).read()
+
+def parse(code):
+    """return the ast and the token positions of a full parse"""
+    tokens = Lexer(code).lexTokens()
+    p = Parser(tokens)
+    root = Scope()
+    while(p.has()):
+        root.add(p.parseStatement())
+    p.consume(Kind.EOF)
+    return repr(root), [(t.kind, t.value, t.start, t.end, t.line) for t in tokens]
+
+def state(parser):
+    """return the ast and the token positions of the incremental parser"""
+    positions = [(t.kind, t.value) + parser.position(index) for index, t in enumerate(parser.tokens)]
+    return repr(parser.root), positions
+
+def edit(parser, code, offset, removed, inserted):
+    """apply an edit and check it against a full parse, returns the new code"""
+    code = code[:offset] + inserted + code[offset + removed:]
+    try:
+        expected = parse(code)
+    except Exception as err:
+        # the incremental parser fails like a full parse
+        with pytest.raises(type(err)):
+            parser.edit(offset, removed, inserted)
+        return code
+
+    parser.edit(offset, removed, inserted)
+    assert state(parser) == expected
+    return code
+
+def test_unchanged():
+    parser = IncrementalParser(fib)
+    assert state(parser) == parse(fib)
+    assert repr(parser.ast) == repr(Parser(Lexer(fib).lexTokens()).parse())
+
+def test_edit_inside_loop():
+    parser = IncrementalParser(fib)
+    offset = fib.index("counter + 1") + len("counter + ")
+    code = edit(parser, fib, offset, 1, "2")
+    code = edit(parser, code, offset, 1, "1")
+    assert code == fib
+
+def test_edit_start_and_end():
+    parser = IncrementalParser(fib)
+    code = edit(parser, fib, 0, 0, "let z = 3;\n")
+    code = edit(parser, code, len(code), 0, "\nprint z;")
+    code = edit(parser, code, 0, len("let z = 3;\n"), "")
+
+def test_insert_scope():
+    parser = IncrementalParser(fib)
+    offset = fib.index("let tmp")
+    code = edit(parser, fib, offset, 0, "if(a < b) { print a; }\n    ")
+    edit(parser, code, offset, 0, "{ let q = 1; }\n    ")
+
+def test_multiline_string():
+    parser = IncrementalParser(fib)
+    code = edit(parser, fib, 0, 0, "print \"a\nb\";\n")
+    code = edit(parser, code, len("print \"a"), 0, "\n\n")
+    edit(parser, code, 0, 0, "\n")
+
+def test_invalid_and_back():
+    parser = IncrementalParser(fib)
+    offset = fib.index("}")
+
+    # removing the closing bracket fails, adding it back works again
+    code = edit(parser, fib, offset, 1, "")
+    code = edit(parser, code, offset, 0, "}")
+    assert state(parser) == parse(fib)
+
+@pytest.mark.parametrize("seed", range(4))
+def test_random_edits(seed):
+    random.seed(seed)
+    pieces = ["a", " ", "\n", ";", "{", "}", "\"", "1", "let x = 2;", "print 3;", "if(x){", "=", "+", "("]
+    code = fib
+    parser = IncrementalParser(code)
+    for step in range(200):
+        offset = random.randint(0, len(code))
+        removed = random.randint(0, min(3, len(code) - offset))
+        inserted = random.choice(pieces) if random.random() < 0.7 else ""
+        code = edit(parser, code, offset, removed, inserted)
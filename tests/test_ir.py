@@ -0,0 +1,60 @@
+import os
+import pytest
+from interpreter import *
+
+# the example program of the repository
+fib = open(os.path.join(os.path.dirname(__file__), "..", "fib")).read()
+
+# small programs covering the edge cases of the lowering and the optimizer
+programs = [
+    "print +true; print -true; print !0; print +3 - -2;",
+    "let a = 1; { let a = 2; print a; } print a;",
+    "let i = 0; let s = 0; while(i < 5) { let j = 0; while(j < i) { s = s + i * j; j = j + 1; } i = i + 1; } print s;",
+    "let x = 3; if(x > 5) { x = 1; } if(x < 5) { x = x * 2; } print x;",
+    "let s = \"ab\"; let n = 0; while(n < 3) { s = s + n; n = n + 1; } print s; print s * 2;",
+    "let a = 5; let b = a * 2 + 1; let c = a * 2 + 1; a = 1; print a * 2 + 1; print b == c;",
+    "let n = 9223372036854775807; print n + n; print 7 / 2;",
+    "let x; x = 4; print x >= 4; print \"a\" < \"b\";",
+]
+
+def variables(values):
+    """return an environment with the variables of the command line"""
+    env = Environment()
+    for name, value in values.items():
+        env.initValue(symbols.intern(name))
+        env.setValue(symbols.intern(name), value)
+    return env
+
+def prepare(code):
+    """parse, check and optimize a program like run.py"""
+    ast = Parser(Lexer(code).lexTokens()).parse()
+    return Optimizer(TypeChecker(ast).check()).optimize()
+
+def interpret(code, values, capsys):
+    """return the output of the ast interpreter"""
+    Interpreter(prepare(code), variables(values), FileLoader()).eval()
+    return capsys.readouterr().out
+
+def ir(code, values, capsys):
+    """return the output of the optimized ir"""
+    function = IROptimizer(Lowering(prepare(code)).lower()).optimize()
+    IRInterpreter(function, variables(values)).eval()
+    return capsys.readouterr().out
+
+@pytest.mark.parametrize("n", [0, 1, 2, 10, 90])
+def test_fib(n, capsys):
+    assert ir(fib, {"fib": n}, capsys) == interpret(fib, {"fib": n}, capsys)
+
+@pytest.mark.parametrize("code", programs)
+def test_programs(code, capsys):
+    assert ir(code, {}, capsys) == interpret(code, {}, capsys)
+
+def test_unsupported():
+    with pytest.raises(UnsupportedError):
+        Lowering(prepare("exec \"print 1;\";")).lower()
+
+def test_repetition_not_folded():
+    # the loop never runs, so the repeated string must not be built
+    function = IROptimizer(Lowering(prepare("while(n < 0) { print \"x\" * 1000; }")).lower()).optimize()
+    values = [instr.value for block in function.blocks for instr in block.instrs]
+    assert not [value for value in values if type(value) == str and len(value) > 1]
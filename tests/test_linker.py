@@ -0,0 +1,34 @@
+import os
+import pytest
+from interpreter import *
+
+def write(path, code):
+    with open(path, "w") as f:
+        f.write(code)
+
+def run(ast, loader, capsys):
+    """return the output of a checked and optimized program"""
+    ast = Optimizer(TypeChecker(ast).check()).optimize()
+    Interpreter(ast, Environment(), loader).eval()
+    return capsys.readouterr().out
+
+def test_load_linked_module_twice(tmp_path, monkeypatch, capsys):
+    # the optimizer moves the invariant 2 * 3 of the module out of its loop
+    monkeypatch.chdir(tmp_path)
+    write("lib", "while(i < 2 * 3) { i = i + 1; }")
+    write("main", "let i = 0; load \"lib\"; print i; i = 0; load \"lib\"; print i;")
+
+    expected = run(FileLoader().load("main"), FileLoader(), capsys)
+    assert expected == "6\n6\n"
+
+    Linker().link("main").write("main.ccp")
+    artifact = Artifact.read("main.ccp")
+    assert run(artifact.root, artifact.loader(), capsys) == expected
+
+def test_read_rejects_invalid(tmp_path):
+    path = os.path.join(tmp_path, "bad.ccp")
+    with open(path, "wb") as f:
+        f.write(Artifact.magic + b"{}\nnot compressed")
+
+    with pytest.raises(ArtifactError):
+        Artifact.read(path)
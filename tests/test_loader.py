@@ -0,0 +1,43 @@
+import time
+import pytest
+from interpreter import *
+
+def write(name, code):
+    with open(name, "w") as f:
+        f.write(code)
+
+def test_prefetch_follows_loads(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write("a", "load \"b\"; let a = 1;")
+    write("b", "load \"c\"; let b = 2;")
+    write("c", "if(1 < 2) { let c = 3; }")
+
+    loader = Prefetcher()
+    try:
+        loader.prefetch(Parser(Lexer("load \"a\";").lexTokens()).parse())
+
+        # the nested loads are parsed before anything is loaded
+        deadline = time.time() + 60
+        while(len(loader.files) < 3 and time.time() < deadline):
+            time.sleep(0.01)
+        assert sorted(loader.files) == ["a", "b", "c"]
+
+        for name in "abc":
+            assert repr(loader.load(name)) == repr(FileLoader().load(name))
+    finally:
+        loader.close()
+
+def test_prefetch_errors(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    write("bad", "let = 1;")
+
+    loader = Prefetcher()
+    try:
+        loader.prefetch(Parser(Lexer("load \"bad\"; load \"missing\";").lexTokens()).parse())
+
+        # the errors of the parse are raised by the load
+        for name, error in (("bad", ParseError), ("missing", FileNotFoundError)):
+            with pytest.raises(error):
+                loader.load(name)
+    finally:
+        loader.close()
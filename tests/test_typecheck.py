@@ -0,0 +1,49 @@
+import pytest
+from interpreter import *
+
+def check(code):
+    """return the checked ast of a program"""
+    return TypeChecker(Parser(Lexer(code).lexTokens()).parse()).check()
+
+def run(code, capsys):
+    """return the output of a checked and optimized program"""
+    ast = Optimizer(check(code)).optimize()
+    Interpreter(ast, Environment(), FileLoader()).eval()
+    return capsys.readouterr().out
+
+@pytest.mark.parametrize("code", [
+    "print 1 < \"a\";",
+    "print \"a\" - 1;",
+    "print -\"a\";",
+    "print true + \"a\";",
+    "let x = 1; if(x > 0) { x = 2; } print x - \"a\";",
+    "let k = 0; while(k < 2) { print k < \"b\"; k = k + 1; }",
+    "let k = 0; while(k < 2) { let j = 0; while(j < 1) { print j - \"b\"; j = j + 1; } k = k + 1; }",
+])
+def test_errors(code):
+    with pytest.raises(TypeMismatchError):
+        check(code)
+
+def test_annotations():
+    ast = check("let a = 1; let s = \"x\"; print a + 1; print s * a; print s + s;")
+    assert [stmt.expr.mode for stmt in ast.stmts[2:]] == [Mode.INTINT, Mode.STRINT, Mode.STRSTR]
+    assert [stmt.expr.type for stmt in ast.stmts[2:]] == [Type.INT, Type.STR, Type.STR]
+
+def test_branch_merges_types():
+    ast = check("let x = 1; let c = 1; if(c > 0) { x = \"a\"; } print x + 1; print c + 1;")
+    assert ast.stmts[3].expr.mode == Mode.UNKNOWN
+    assert ast.stmts[4].expr.mode == Mode.INTINT
+
+def test_loop_changes_type(capsys):
+    # the comparison only runs once x is a string, the first pass must not fail
+    code = "let x = 1; let k = 0; while(k < 2) { if(k == 1) { print x < \"b\"; } x = \"a\"; k = k + 1; }"
+    assert run(code, capsys) == "True\n"
+
+def test_nested_loop_changes_type(capsys):
+    code = ("let x = 1; let k = 0; while(k < 2) { let j = 0; while(j < 1) {"
+            " if(k == 1) { print x + \"b\"; } j = j + 1; } x = \"a\"; k = k + 1; }")
+    assert run(code, capsys) == "ab\n"
+
+def test_loop_annotations_are_final():
+    ast = check("let x = 1; let k = 0; while(k < 2) { print x + 1; x = \"a\"; k = k + 1; }")
+    assert ast.stmts[2].scope.stmts[0].expr.mode == Mode.UNKNOWN
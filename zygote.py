@@ -0,0 +1,35 @@
+import sys
+from interpreter import *
+from interpreter.zygote import Zygote
+from run import main
+
+def serve():
+    """start the zygote and serve until it is stopped"""
+
+    # usage: python zygote.py [--socket=path] [library ...]
+    options = [arg for arg in sys.argv[1:] if arg.startswith("--")]
+    libraries = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    path = None
+    for option in options:
+        if(option.startswith("--socket=")):
+            path = option[len("--socket="):]
+
+    try:
+        # parse the libraries once, every worker gets a copy
+        zygote = Zygote(main, path, libraries)
+        print("serving on %s" % (zygote.path))
+        sys.stdout.flush()
+        zygote.serve()
+
+    except FileNotFoundError as err:
+        print(FileCouldNotBeLoaded(err.filename))
+        sys.exit(1)
+    except Error as err:
+        print(err)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        pass
+
+# the workers of the prefetcher import this file without running it
+if(__name__ == "__main__"):
+    serve()